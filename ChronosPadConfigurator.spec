@@ -7,15 +7,20 @@ from pathlib import Path
 
 block_cipher = None
 
+datas = [
+    ('profiles.json', '.'),  # Include profiles.json in the exe
+    ('libraries/kmk', 'libraries/kmk'),  # Bundle KMK firmware (essential folder only)
+    ('libraries/lib', 'libraries/lib'),  # Bundle required CircuitPython 10.x libraries
+]
+# Pre-packed KMK archive (created by build_exe.py) for faster exports
+if Path('libraries/kmk_bundle.zip').exists():
+    datas.append(('libraries/kmk_bundle.zip', 'libraries'))
+
 a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[
-        ('profiles.json', '.'),  # Include profiles.json in the exe
-        ('libraries/kmk', 'libraries/kmk'),  # Bundle KMK firmware (essential folder only)
-        ('libraries/lib', 'libraries/lib'),  # Bundle required CircuitPython 10.x libraries
-    ],
+    datas=datas,
     hiddenimports=[
         'PyQt6',
         'PyQt6.QtCore',
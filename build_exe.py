@@ -17,14 +17,40 @@ import subprocess
 import sys
 import os
 import shutil
+import zipfile
 from pathlib import Path
 
+
+def build_kmk_bundle(source_dir='libraries/kmk', zip_path='libraries/kmk_bundle.zip'):
+    """Pack the KMK firmware tree into an uncompressed zip for fast exports.
+
+    The configurator extracts this archive onto the board instead of copying
+    the kmk/ folder file-by-file. Entries are stored (not deflated) because the
+    goal is fewer filesystem operations, not a smaller file.
+    """
+    if not os.path.isdir(source_dir):
+        print(f"Warning: {source_dir} not found, skipping KMK bundle")
+        return False
+    parent = os.path.dirname(source_dir)
+    with zipfile.ZipFile(zip_path, 'w', compression=zipfile.ZIP_STORED) as bundle:
+        for root, dirs, files in os.walk(source_dir):
+            dirs[:] = [d for d in dirs if d != '__pycache__']
+            for name in sorted(files):
+                full_path = os.path.join(root, name)
+                bundle.write(full_path, os.path.relpath(full_path, parent))
+    print(f"Packed {source_dir} into {zip_path}")
+    return True
+
+
 # Check if profiles.json exists
 if not os.path.exists('profiles.json'):
     print("Warning: profiles.json not found, creating empty file")
     with open('profiles.json', 'w') as f:
         f.write('{}')
 
+# Pre-pack the KMK firmware so exports can extract one archive
+build_kmk_bundle()
+
 # Clean old build files
 if os.path.exists('build'):
     print("Cleaning old build files...")
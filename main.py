@@ -19,8 +19,10 @@ underlying hardware pin configuration.
 
 from __future__ import annotations
 
+import io
 import sys
 import re
+import itertools
 import ast
 import json
 import os
@@ -29,6 +31,7 @@ import traceback
 import urllib.request
 import zipfile
 import shutil
+from contextlib import contextmanager
 from pathlib import Path
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -36,13 +39,12 @@ from PyQt6.QtWidgets import (
     QTabWidget, QSizePolicy, QLineEdit, QFileDialog, QMessageBox,
     QComboBox, QDialog, QDialogButtonBox, QCheckBox, QInputDialog, QColorDialog,
     QFormLayout, QDoubleSpinBox, QProgressDialog, QScrollArea, QFrame, QSplitter,
-    QListWidgetItem, QMenu, QStyledItemDelegate, QStyle
+    QListWidgetItem, QMenu, QStyledItemDelegate, QStyle, QAbstractItemView
 )
 from PyQt6.QtWidgets import QTextEdit
-from PyQt6.QtCore import Qt, QEvent, QPropertyAnimation, QEasingCurve, QObject, QThread, pyqtSignal, QPoint, QRect
-from PyQt6.QtGui import QFont, QColor, QPainter
-from PyQt6.QtWidgets import QGraphicsDropShadowEffect
-from functools import partial
+from PyQt6.QtCore import Qt, QEvent, QPropertyAnimation, QEasingCurve, QThread, QTimer, pyqtSignal, QPoint, QRect
+from PyQt6.QtGui import QFont, QColor, QPainter, QBrush
+from functools import lru_cache, partial
 
 # --- Path Resolution for PyInstaller ---
 def get_application_path():
@@ -62,13 +64,23 @@ BASE_DIR = get_application_path()
 # Folder structure - all at root level for simplicity
 LIBRARIES_DIR = os.path.join(BASE_DIR, "libraries")
 CONFIG_SAVE_DIR = os.path.join(BASE_DIR, "kmk_Config_Save")
+# Optional uncompressed archive of libraries/kmk produced by build_exe.py; when
+# present, exporting extracts it instead of copying the firmware file-by-file
+KMK_BUNDLE_ZIP = os.path.join(LIBRARIES_DIR, "kmk_bundle.zip")
+# Saved configuration files listed in the config selector (config*.json, any case)
+CONFIG_FILE_NAME_RE = re.compile(r"config.*\.json\Z", re.IGNORECASE | re.DOTALL)
 
 # Create folders if they don't exist
 os.makedirs(LIBRARIES_DIR, exist_ok=True)
 os.makedirs(CONFIG_SAVE_DIR, exist_ok=True)
 
 # --- Default Values ---
-DEFAULT_KEY = "KC.NO"
+DEFAULT_KEY = sys.intern("KC.NO")
+
+# Keymap entries that reference a GUI-defined macro, e.g. "MACRO(copy_paste)"
+MACRO_KEY_PATTERN = re.compile(r"MACRO\((\w+)\)")
+# TapDance definitions in the custom extension code, e.g. "TD_ESC = KC.TD("
+TAPDANCE_DEF_PATTERN = re.compile(r"([A-Z_][A-Z0-9_]*)\s*=\s*KC\.TD\s*\(")
 
 # Configuration files - all at root level
 PROFILE_FILE = os.path.join(BASE_DIR, "profiles.json")
@@ -184,6 +196,93 @@ class DependencyDownloader(QThread):
         else:
             raise Exception(f"Could not download CircuitPython {self.cp_version}.x bundle from recent dates")
 
+class BoardLibraryCopier(QThread):
+    """Copies the KMK firmware and required CircuitPython libraries to a board.
+
+    CIRCUITPY is a slow USB mass-storage device, so the copy runs off the GUI
+    thread to keep the window responsive; code.py itself is written first on
+    the main thread. Results are exposed as attributes once `finished` fires.
+
+    Args:
+        folder_path: Destination folder (usually the board drive root)
+        copy_kmk: Whether the kmk/ firmware folder still needs to be copied
+        kmk_source: Path to libraries/kmk, used when no KMK_BUNDLE_ZIP exists
+        lib_source: Path to libraries/lib, or None when the libraries are missing
+    """
+    progress = pyqtSignal(str, int)  # message, percentage
+    finished = pyqtSignal(bool)  # success
+
+    REQUIRED_LIBS = [
+        "adafruit_displayio_sh1106.mpy",
+        "adafruit_display_text",  # folder
+        "neopixel.mpy"
+    ]
+
+    def __init__(self, folder_path, copy_kmk, kmk_source, lib_source):
+        super().__init__()
+        self.folder_path = folder_path
+        self.copy_kmk = copy_kmk
+        self.kmk_source = kmk_source
+        self.lib_source = lib_source
+        self.kmk_copied = False
+        self.copied_files = []
+        self.error = None
+
+    def run(self):
+        """Copy the firmware and libraries, reporting progress per item"""
+        try:
+            total_steps = len(self.REQUIRED_LIBS) + 1
+            if self.copy_kmk:
+                self.progress.emit("Copying KMK firmware...", 0)
+                self.copy_kmk_firmware()
+
+            lib_dest = os.path.join(self.folder_path, "lib")
+            # Create lib folder if it doesn't exist
+            os.makedirs(lib_dest, exist_ok=True)
+
+            if self.lib_source:  # Only copy if libraries were found
+                # One directory listing; DirEntry.is_dir() reuses the type info
+                # from readdir instead of an exists() + isdir() stat pair per lib
+                with os.scandir(self.lib_source) as listing:
+                    available = {entry.name: entry for entry in listing}
+                for step, lib_name in enumerate(self.REQUIRED_LIBS, start=1):
+                    self.progress.emit(f"Copying {lib_name}...", step * 100 // total_steps)
+                    entry = available.get(lib_name)
+                    if entry is not None:
+                        self.copy_library(entry, lib_dest)
+
+            self.progress.emit("Libraries copied", 100)
+            self.finished.emit(True)
+        except Exception as e:
+            self.error = e
+            self.finished.emit(False)
+
+    def copy_kmk_firmware(self):
+        """Copy kmk/ to the board, preferring the pre-packed archive"""
+        if os.path.exists(KMK_BUNDLE_ZIP):
+            # One sequential read of a stored archive is much cheaper on
+            # the board's FAT drive than a stat/open/copy per file
+            with zipfile.ZipFile(KMK_BUNDLE_ZIP) as bundle:
+                bundle.extractall(self.folder_path)
+        else:
+            shutil.copytree(self.kmk_source, os.path.join(self.folder_path, "kmk"))
+        self.kmk_copied = True
+
+    def copy_library(self, entry, lib_dest):
+        """Copy one required library (an os.DirEntry from lib_source) into lib_dest"""
+        dst = os.path.join(lib_dest, entry.name)
+
+        if entry.is_dir():
+            # Copy directory
+            if os.path.exists(dst):
+                shutil.rmtree(dst)
+            shutil.copytree(entry.path, dst)
+            self.copied_files.append(f"{entry.name}/ (folder)")
+        else:
+            # Copy file
+            shutil.copy2(entry.path, dst)
+            self.copied_files.append(entry.name)
+
 # --- Settings Management ---
 def load_settings():
     """Load application settings from settings.json
@@ -193,8 +292,8 @@ def load_settings():
     """
     if os.path.exists(SETTINGS_FILE):
         try:
-            with open(SETTINGS_FILE, 'r') as f:
-                return json.load(f)
+            # json.loads takes bytes directly, skipping the text decoder layer
+            return json.loads(Path(SETTINGS_FILE).read_bytes())
         except Exception:
             pass
     return {}
@@ -267,10 +366,9 @@ RGB_ORDER_TUPLES = {
 }
 
 
-def hex_to_rgb_list(color: str) -> list[int]:
-    """Convert a hex color string (e.g. #FFAABB) into an [r, g, b] list."""
-    if not isinstance(color, str):
-        color = "#000000"
+@lru_cache(maxsize=256)
+def _hex_to_rgb_tuple(color: str) -> tuple[int, int, int]:
+    """Parse a hex color string into an immutable (r, g, b) tuple (memoized)."""
     clean = color.strip().lstrip('#')
     if len(clean) != 6:
         clean = "000000"
@@ -278,9 +376,21 @@ def hex_to_rgb_list(color: str) -> list[int]:
         r = int(clean[0:2], 16)
         g = int(clean[2:4], 16)
         b = int(clean[4:6], 16)
-        return [r, g, b]
+        return (r, g, b)
     except ValueError:
-        return [0, 0, 0]
+        return (0, 0, 0)
+
+
+def hex_to_rgb_list(color: str) -> list[int]:
+    """Convert a hex color string (e.g. #FFAABB) into an [r, g, b] list.
+
+    Parsing is memoized because the same handful of colors (defaults and
+    category presets) is converted for every key; a fresh list is returned
+    each call so callers may mutate it safely.
+    """
+    if not isinstance(color, str):
+        color = "#000000"
+    return list(_hex_to_rgb_tuple(color))
 
 
 def ensure_hex_prefix(color: str, fallback: str) -> str:
@@ -301,6 +411,40 @@ def ensure_hex_prefix(color: str, fallback: str) -> str:
         return fallback
     return f"#{clean.upper()}"
 
+
+@lru_cache(maxsize=256)
+def colored_key_button_style(color: str) -> str:
+    """Build the keymap grid stylesheet for a key lit with `color` (memoized).
+
+    Text is black on light colors and white on dark ones, judged by perceived
+    luminance; colors that cannot be parsed get white text.
+    """
+    try:
+        # Remove # and convert to RGB
+        rgb = color.lstrip('#')
+        r_val = int(rgb[0:2], 16)
+        g_val = int(rgb[2:4], 16)
+        b_val = int(rgb[4:6], 16)
+        # Calculate perceived luminance
+        luminance = (0.299 * r_val + 0.587 * g_val + 0.114 * b_val)
+        text_color = '#000000' if luminance > 128 else '#FFFFFF'
+    except (AttributeError, ValueError):
+        text_color = '#FFFFFF'
+    return f'background-color: {color}; color: {text_color}; font-weight: bold; font-size: 9pt;'
+
+
+def led_colors_by_index(*color_maps: dict) -> dict[int, str]:
+    """Merge LED color maps keyed by index strings ("0", "1", ...) into one {int: color} dict.
+
+    Later maps take precedence; entries with an empty color are skipped.
+    """
+    merged = {}
+    for color_map in color_maps:
+        for key, color in color_map.items():
+            if color and isinstance(key, str) and key.isdecimal() and str(int(key)) == key:
+                merged[int(key)] = color
+    return merged
+
 # --- Default Extension Configuration Templates ---
 DEFAULT_ENCODER_CONFIG = '''import board
 from kmk.modules.encoder import EncoderHandler
@@ -484,6 +628,38 @@ display.root_group = splash
 # text_area = label.Label(terminalio.FONT, text="Hello!", color=0xFFFFFF, x=0, y=10)
 # splash.append(text_area)'''
 
+# --- Generated code.py Fragments ---
+# Imports every generated code.py starts with; optional modules are appended
+CODE_PY_BASE_IMPORTS = (
+    "import board",
+    "from kmk.kmk_keyboard import KMKKeyboard",
+    "from kmk.keys import KC",
+    "from kmk.scanners import DiodeOrientation",
+    "from kmk.modules.layers import Layers",
+    "from kmk.extensions.media_keys import MediaKeys",
+)
+
+# Placeholder setup emitted for an enabled module the user has not configured
+CODE_PY_DEFAULT_ENCODER_SNIPPET = (
+    "# --- Encoder Handler (auto-generated) ---\n"
+    "encoder_handler = EncoderHandler()\n"
+    "# Configure pins and map for your hardware. Examples:\n"
+    "# encoder_handler.pins = ((board.GP17, board.GP15, board.GP14),)\n"
+    "# encoder_handler.map = [ ((KC.VOLD, KC.VOLU, KC.MUTE),), ]\n"
+    "keyboard.modules.append(encoder_handler)\n\n"
+)
+# Macro action types and the kmk.modules.macros constructor each one emits
+MACRO_ACTION_CONSTRUCTORS = {"tap": "Tap", "press": "Press", "release": "Release"}
+
+CODE_PY_DEFAULT_ANALOGIN_SNIPPET = (
+    "# --- Analog Inputs (auto-generated) ---\n"
+    "# Example usage (requires 'analogio' on target device):\n"
+    "# from analogio import AnalogIn\n"
+    "# a0 = AnalogInput(AnalogIn(board.A0))\n"
+    "# analog = AnalogInputs([a0], [[AnalogKey(KC.X)]])\n"
+    "# keyboard.modules.append(analog)\n\n"
+)
+
 
 # --- KMK Keycode Data ---
 # Expanded to include more common keys like function keys and miscellaneous controls.
@@ -547,6 +723,12 @@ KEYCODES = {
         "KC.NO", "KC.TRNS", "KC.RESET"
     ]
 }
+# Freeze each category into a tuple of interned strings, so keycodes
+# compared against them are usually the very same object.
+KEYCODES = {
+    category: tuple(sys.intern(keycode) for keycode in keycodes)
+    for category, keycodes in KEYCODES.items()
+}
 
 # Keycode display labels - shows actual symbol or descriptive name
 # Format: "keycode": "label"
@@ -667,6 +849,151 @@ QT_TO_KMK = {
     Qt.Key.Key_BracketLeft: "KC.LBRC", Qt.Key.Key_Backslash: "KC.BSLS",
     Qt.Key.Key_BracketRight: "KC.RBRC", Qt.Key.Key_QuoteLeft: "KC.GRV",
 }
+# Qt keys pressed with the keypad modifier map to KMK's KP_ keycodes instead.
+QT_NUMPAD_TO_KMK = {
+    Qt.Key.Key_0: "KC.KP_0", Qt.Key.Key_1: "KC.KP_1", Qt.Key.Key_2: "KC.KP_2",
+    Qt.Key.Key_3: "KC.KP_3", Qt.Key.Key_4: "KC.KP_4", Qt.Key.Key_5: "KC.KP_5",
+    Qt.Key.Key_6: "KC.KP_6", Qt.Key.Key_7: "KC.KP_7", Qt.Key.Key_8: "KC.KP_8",
+    Qt.Key.Key_9: "KC.KP_9", Qt.Key.Key_Period: "KC.KP_DOT",
+    Qt.Key.Key_Slash: "KC.KP_SLASH", Qt.Key.Key_Asterisk: "KC.KP_ASTERISK",
+    Qt.Key.Key_Minus: "KC.KP_MINUS", Qt.Key.Key_Plus: "KC.KP_PLUS",
+    Qt.Key.Key_Enter: "KC.KP_ENTER", Qt.Key.Key_Equal: "KC.KP_EQUAL",
+    Qt.Key.Key_Comma: "KC.KP_COMMA",
+}
+# QKeyEvent.key() returns a plain int; keying the tables by int as well keeps
+# each keystroke lookup an int hash/compare instead of going through IntEnum.
+# Values are interned like the KEYCODES entries they mirror.
+QT_TO_KMK = {int(qt_key): sys.intern(keycode) for qt_key, keycode in QT_TO_KMK.items()}
+QT_NUMPAD_TO_KMK = {
+    int(qt_key): sys.intern(keycode) for qt_key, keycode in QT_NUMPAD_TO_KMK.items()
+}
+
+
+@lru_cache(maxsize=1)
+def keycode_search_index() -> tuple[tuple[str, str, str], ...]:
+    """Return (category, keycode, lowercased "keycode label") for every keycode.
+
+    Built on the first search rather than at startup, and only once.
+    """
+    return tuple(
+        (category, keycode, f"{keycode} {KEYCODE_LABELS.get(keycode, '')}".lower())
+        for category, key_list in KEYCODES.items()
+        for keycode in key_list
+    )
+
+
+# --- OLED Display Label Abbreviations ---
+# Short labels (max 4 chars) used by the layer-aware OLED keymap view.
+DISPLAY_LABEL_MAX_LEN = 4
+DISPLAY_KEY_ABBREVIATIONS = {
+    # Modifiers (3 chars)
+    "LCTL": "LCt", "RCTL": "RCt",
+    "LSFT": "LSh", "RSFT": "RSh",
+    "LALT": "LAl", "RALT": "RAl",
+    "LGUI": "LWi", "RGUI": "RWi",
+    # Common actions (3-4 chars)
+    "BSPC": "BkSp", "ENT": "Ent",
+    "SPC": "Spc", "TAB": "Tab",
+    "ESC": "Esc", "DEL": "Del",
+    # Navigation (3-4 chars)
+    "PGUP": "PgUp", "PGDN": "PgDn",
+    "HOME": "Hom", "END": "End",
+    "UP": "Up", "DOWN": "Dwn",
+    "LEFT": "Lft", "RGHT": "Rgt",
+    # Media (3-4 chars)
+    "VOLU": "V+", "VOLD": "V-",
+    "MUTE": "Mut", "MPLY": "Ply",
+    "MNXT": "Nxt", "MPRV": "Prv",
+    "MSTP": "Stp", "EJCT": "Ejt",
+    "BRIU": "B+", "BRID": "B-",
+    # Numbers stay as-is
+    "N1": "1", "N2": "2", "N3": "3", "N4": "4", "N5": "5",
+    "N6": "6", "N7": "7", "N8": "8", "N9": "9", "N0": "0",
+    # Function keys
+    "F1": "F1", "F2": "F2", "F3": "F3", "F4": "F4",
+    "F5": "F5", "F6": "F6", "F7": "F7", "F8": "F8",
+    "F9": "F9", "F10": "F10", "F11": "F11", "F12": "F12",
+}
+# Empty/transparent cells dominate sparse keymaps; checked first with one hash lookup
+_BLANK_DISPLAY_KEYS = frozenset((None, "", "KC.NO", "KC.TRNS"))
+# Turns "LCTL(C)" into "LCTL+C" in one pass (after the KC. prefixes are gone)
+_COMBO_LABEL_TRANSLATION = str.maketrans({"(": "+", ")": None})
+
+
+@lru_cache(maxsize=512)
+def abbreviate_display_key(key_str: str) -> str:
+    """
+    Abbreviate a keycode string into a short OLED label.
+
+    The result depends only on the keycode, and keymaps are dominated by a
+    handful of repeated values (KC.NO, KC.TRNS, ...), so results are memoized
+    and repeated keys across layers skip all string work.
+
+    Args:
+        key_str: Keymap entry such as "KC.A", "KC.LCTL(KC.C)" or "MACRO(name)"
+
+    Returns:
+        Label of at most DISPLAY_LABEL_MAX_LEN characters ("---" for empty keys)
+
+    Example:
+        >>> abbreviate_display_key("KC.LCTL(KC.C)")
+        'LCTL'
+    """
+    if key_str in _BLANK_DISPLAY_KEYS:
+        return "---"
+
+    # Handle macros
+    if key_str.startswith("MACRO("):
+        return key_str[6:-1][:DISPLAY_LABEL_MAX_LEN]  # Extract name from MACRO(name)
+
+    # Handle layer switches
+    if "MO(" in key_str or "TG(" in key_str or "TO(" in key_str:
+        return key_str.replace("KC.", "")[:DISPLAY_LABEL_MAX_LEN]
+
+    # Handle key combinations (e.g., KC.LCTL(KC.C) -> LCTL+C)
+    if "(" in key_str:
+        return key_str.replace("KC.", "").translate(_COMBO_LABEL_TRANSLATION)[:DISPLAY_LABEL_MAX_LEN]
+
+    # Standard keys - remove KC. prefix and apply common abbreviations
+    key = key_str.replace("KC.", "")
+    return DISPLAY_KEY_ABBREVIATIONS.get(key, key)[:DISPLAY_LABEL_MAX_LEN]
+
+
+@lru_cache(maxsize=512)
+def format_keymap_button_label(key_text: str) -> str:
+    """
+    Format a keycode string for the configurator's keymap grid buttons.
+
+    Like abbreviate_display_key this is memoized, so each distinct keycode is
+    formatted once no matter how often the grid is refreshed.
+
+    Args:
+        key_text: Keymap entry such as "KC.A", "KC.MO(1)" or "MACRO(name)"
+
+    Returns:
+        Button label with an icon prefix for macros, tap dances and layer keys
+
+    Example:
+        >>> format_keymap_button_label("MACRO(hello)")
+        '⚡ hello'
+    """
+    # Only run the macro regex on entries that can actually be macros
+    if key_text.startswith("MACRO("):
+        macro_match = MACRO_KEY_PATTERN.match(key_text)
+        if macro_match:
+            return f"⚡ {macro_match.group(1)}"
+    if key_text.startswith("TD_"):
+        # TapDance keys
+        return f"🎯 {key_text[3:]}"
+    if "MO(" in key_text or "TO(" in key_text or "TG(" in key_text or "DF(" in key_text:
+        # Layer switching keys
+        return f"📚 {key_text.replace('KC.', '')}"
+    if key_text == "KC.NO":
+        return "✖"
+    if key_text == "KC.TRNS":
+        return "🔄 TRNS"
+    # Standard keycodes - remove KC. prefix
+    return key_text.replace("KC.", "")
 
 
 # --- New Dialog for Creating Key Combos (e.g., Ctrl+C) ---
@@ -691,6 +1018,10 @@ class ComboCreatorDialog(QDialog):
             "RALT": QCheckBox("Right Alt"),
             "RGUI": QCheckBox("Right GUI (Win/Cmd)"),
         }
+        # Wrapping order for get_combo_string, with each box's isChecked bound once
+        self._mod_items = tuple(
+            (name, checkbox.isChecked) for name, checkbox in self.mod_checkboxes.items()
+        )
         
         # Arrange checkboxes in two columns
         row, col = 0, 0
@@ -725,22 +1056,45 @@ class ComboCreatorDialog(QDialog):
 
         combo = base_key
         # Wrap the base key in each selected modifier
-        for mod_name, checkbox in self.mod_checkboxes.items():
-            if checkbox.isChecked():
+        for mod_name, is_checked in self._mod_items:
+            if is_checked():
                 combo = f"KC.{mod_name}({combo})"
         
         return combo
 
 
 # --- Macro Recorder Dialog ---
+# Text color for recorder entries auto-collapsed from press+release into a tap
+TAP_COLOR = QColor(0, 204, 102)
+# Most actions a single recording may hold, so a recorder left running can't
+# grow the sequence (and its list widget) without bound
+MAX_MACRO_LEN = 4096
+# List labels for each macro action type ("Tap: KC.A", "Delay: 100", ...)
+ACTION_PREFIX = {
+    action_type: f"{action_type.title()}: "
+    for action_type in ('tap', 'press', 'release', 'text', 'delay')
+}
+
+
 class MacroRecorderDialog(QDialog):
     """A dialog to record a sequence of key presses and releases."""
+    # Event types intercepted by event() while recording
+    _KEY_PRESS = QEvent.Type.KeyPress
+    _KEY_RELEASE = QEvent.Type.KeyRelease
+    _SHORTCUT_OVERRIDE = QEvent.Type.ShortcutOverride
+    _INTERCEPTED_TYPES = frozenset(
+        int(event_type) for event_type in (_KEY_PRESS, _KEY_RELEASE, _SHORTCUT_OVERRIDE)
+    )
+    # Threshold (seconds) under which a press+release is considered a tap
+    TAP_THRESHOLD = 0.20
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        # Set before anything else so event() can check it straight away
+        self.recording = False
         self.setWindowTitle("Macro Recorder")
         self.setMinimumSize(400, 300)
 
-        self.recording = False
         self.sequence = []
         self.pressed_keys = set()
         # Map of physical key -> (press_time, sequence_index) so we can
@@ -748,9 +1102,6 @@ class MacroRecorderDialog(QDialog):
         # action instead of separate press/release entries.
         self.press_timestamps = {}
         self.last_event_time = 0
-        # Threshold (seconds) under which a press+release is considered a tap
-        self.TAP_THRESHOLD = 0.20
-        self._filter_installed = False
 
         layout = QVBoxLayout(self)
         
@@ -759,6 +1110,15 @@ class MacroRecorderDialog(QDialog):
         layout.addWidget(self.instructions)
 
         self.sequence_list = QListWidget()
+        # Bold variant of the list font for auto-collapsed tap entries
+        self._tap_font = QFont(self.sequence_list.font())
+        self._tap_font.setBold(True)
+        # Item roles restyled when a press collapses into a tap; only the
+        # display text changes per tap, so one setItemData call does it all.
+        self._tap_roles = {
+            Qt.ItemDataRole.ForegroundRole: QBrush(TAP_COLOR),
+            Qt.ItemDataRole.FontRole: self._tap_font,
+        }
         layout.addWidget(self.sequence_list)
 
         # Legend explaining visual indicators
@@ -795,20 +1155,11 @@ class MacroRecorderDialog(QDialog):
         self.button_box.rejected.connect(self.reject)
         layout.addWidget(self.button_box)
 
-    def _install_event_filter(self):
-        app = QApplication.instance()
-        if app and not self._filter_installed:
-            app.installEventFilter(self)
-            self._filter_installed = True
-
-    def _remove_event_filter(self):
-        app = QApplication.instance()
-        if app and self._filter_installed:
-            try:
-                app.removeEventFilter(self)
-            except Exception:
-                pass
-            self._filter_installed = False
+    def _grab_keyboard(self):
+        # Qt delivers every key event straight to the grabbing widget, so
+        # nothing typed while recording reaches other widgets.
+        if self.isVisible():
+            self.grabKeyboard()
 
     def toggle_recording(self):
         self.recording = not self.recording
@@ -823,45 +1174,36 @@ class MacroRecorderDialog(QDialog):
             self.add_text_btn.setEnabled(True)
             self.add_delay_btn.setEnabled(True)
             self.setFocus()
-            # Install an application-wide event filter so key events are
-            # swallowed while recording and do not reach other widgets.
-            self._install_event_filter()
+            # Grab the keyboard so key events are swallowed while recording
+            # and do not reach other widgets.
+            self._grab_keyboard()
         else:
             self.record_button.setText("Start Recording")
             self.instructions.setText("Click 'Start Recording' to begin.")
             self.add_text_btn.setEnabled(False)
             self.add_delay_btn.setEnabled(False)
-            self._remove_event_filter()
+            self.releaseKeyboard()
 
     def keyPressEvent(self, event):
         if not self.recording or event.isAutoRepeat():
             super().keyPressEvent(event)
             return
+        # Once full, new presses are dropped before being marked as held, so
+        # their releases are ignored too; keys already held still release.
+        if self._sequence_full():
+            return
 
         key = event.key()
-        if key in self.pressed_keys:
+        pressed_keys = self.pressed_keys
+        if key in pressed_keys:
             return
 
-        self.pressed_keys.add(key)
+        pressed_keys.add(key)
         
-        # Check if this is a numpad key
-        modifiers = event.modifiers()
-        is_numpad = bool(modifiers & Qt.KeyboardModifier.KeypadModifier)
-        
-        # Map numpad numbers to KP_ keycodes
+        # Map numpad keys to KP_ keycodes, everything else via the main table
         keycode = None
-        if is_numpad:
-            numpad_map = {
-                Qt.Key.Key_0: "KC.KP_0", Qt.Key.Key_1: "KC.KP_1", Qt.Key.Key_2: "KC.KP_2",
-                Qt.Key.Key_3: "KC.KP_3", Qt.Key.Key_4: "KC.KP_4", Qt.Key.Key_5: "KC.KP_5",
-                Qt.Key.Key_6: "KC.KP_6", Qt.Key.Key_7: "KC.KP_7", Qt.Key.Key_8: "KC.KP_8",
-                Qt.Key.Key_9: "KC.KP_9", Qt.Key.Key_Period: "KC.KP_DOT",
-                Qt.Key.Key_Slash: "KC.KP_SLASH", Qt.Key.Key_Asterisk: "KC.KP_ASTERISK",
-                Qt.Key.Key_Minus: "KC.KP_MINUS", Qt.Key.Key_Plus: "KC.KP_PLUS",
-                Qt.Key.Key_Enter: "KC.KP_ENTER", Qt.Key.Key_Equal: "KC.KP_EQUAL",
-                Qt.Key.Key_Comma: "KC.KP_COMMA",
-            }
-            keycode = numpad_map.get(key)
+        if event.modifiers() & Qt.KeyboardModifier.KeypadModifier:
+            keycode = QT_NUMPAD_TO_KMK.get(key)
         
         if not keycode:
             keycode = QT_TO_KMK.get(key)
@@ -869,10 +1211,10 @@ class MacroRecorderDialog(QDialog):
         if keycode:
             # Record the press and remember when/where it was added so we
             # can convert it to a 'tap' later if released quickly.
-            now = time.monotonic()
-            self.sequence.append(('press', keycode))
-            self.sequence_list.addItem(f"Press: {keycode}")
-            self.press_timestamps[key] = (now, len(self.sequence) - 1)
+            sequence = self.sequence
+            sequence.append(('press', keycode))
+            self.sequence_list.addItem(ACTION_PREFIX['press'] + keycode)
+            self.press_timestamps[key] = (time.monotonic(), len(sequence) - 1)
 
     def keyReleaseEvent(self, event):
         if not self.recording or event.isAutoRepeat():
@@ -880,153 +1222,117 @@ class MacroRecorderDialog(QDialog):
             return
 
         key = event.key()
-        if key not in self.pressed_keys:
+        pressed_keys = self.pressed_keys
+        if key not in pressed_keys:
             return
             
-        self.pressed_keys.discard(key)
-        
-        # Check if this is a numpad key
-        modifiers = event.modifiers()
-        is_numpad = bool(modifiers & Qt.KeyboardModifier.KeypadModifier)
+        pressed_keys.discard(key)
         
-        # Map numpad numbers to KP_ keycodes
+        # Map numpad keys to KP_ keycodes, everything else via the main table
         keycode = None
-        if is_numpad:
-            numpad_map = {
-                Qt.Key.Key_0: "KC.KP_0", Qt.Key.Key_1: "KC.KP_1", Qt.Key.Key_2: "KC.KP_2",
-                Qt.Key.Key_3: "KC.KP_3", Qt.Key.Key_4: "KC.KP_4", Qt.Key.Key_5: "KC.KP_5",
-                Qt.Key.Key_6: "KC.KP_6", Qt.Key.Key_7: "KC.KP_7", Qt.Key.Key_8: "KC.KP_8",
-                Qt.Key.Key_9: "KC.KP_9", Qt.Key.Key_Period: "KC.KP_DOT",
-                Qt.Key.Key_Slash: "KC.KP_SLASH", Qt.Key.Key_Asterisk: "KC.KP_ASTERISK",
-                Qt.Key.Key_Minus: "KC.KP_MINUS", Qt.Key.Key_Plus: "KC.KP_PLUS",
-                Qt.Key.Key_Enter: "KC.KP_ENTER", Qt.Key.Key_Equal: "KC.KP_EQUAL",
-                Qt.Key.Key_Comma: "KC.KP_COMMA",
-            }
-            keycode = numpad_map.get(key)
+        if event.modifiers() & Qt.KeyboardModifier.KeypadModifier:
+            keycode = QT_NUMPAD_TO_KMK.get(key)
         
         if not keycode:
             keycode = QT_TO_KMK.get(key)
         
         if keycode:
             now = time.monotonic()
+            sequence = self.sequence
+            sequence_list = self.sequence_list
             press_info = self.press_timestamps.pop(key, None)
             if press_info is not None:
                 press_time, seq_index = press_info
-                delta = now - press_time
-                if delta <= self.TAP_THRESHOLD:
+                if now - press_time <= self.TAP_THRESHOLD:
                     # Convert the earlier 'press' entry into a 'tap'
-                    if 0 <= seq_index < len(self.sequence):
-                        self.sequence[seq_index] = ('tap', keycode)
-                        item = self.sequence_list.item(seq_index)
-                        if item:
-                            item.setText(f"Tap: {keycode}")
-                            # Style the item to indicate it was auto-collapsed
-                            item.setForeground(QColor('#00cc66'))
-                            font = item.font()
-                            font.setBold(True)
-                            item.setFont(font)
+                    if 0 <= seq_index < len(sequence):
+                        sequence[seq_index] = ('tap', keycode)
+                        # Relabel and style the item to indicate it was auto-collapsed
+                        model = sequence_list.model()
+                        roles = self._tap_roles
+                        roles[Qt.ItemDataRole.DisplayRole] = ACTION_PREFIX['tap'] + keycode
+                        model.setItemData(model.index(seq_index, 0), roles)
                     else:
                         # Fallback: append a tap if index is invalid
-                        self.sequence.append(('tap', keycode))
-                        self.sequence_list.addItem(f"Tap: {keycode}")
-                else:
-                    # Not a quick tap — record release normally
-                    self.sequence.append(('release', keycode))
-                    self.sequence_list.addItem(f"Release: {keycode}")
-            else:
-                # No recorded press timestamp (edge case) — just record release
-                self.sequence.append(('release', keycode))
-                self.sequence_list.addItem(f"Release: {keycode}")
-
-    def eventFilter(self, obj, event):
-        # While recording, consume key press/release events so they don't
-        # propagate to the rest of the application or other programs.
-        # This ensures keyboard input is ONLY captured by the recorder.
-        if not self.recording:
-            return False
-
-        event_type = event.type()
-        
-        # Block all keyboard events from propagating
-        if event_type == QEvent.Type.KeyPress:
-            # Forward to our handler and consume the event
-            try:
-                self.keyPressEvent(event)
-            except Exception:
-                pass
-            return True  # Event consumed - won't reach other widgets or OS
-            
-        elif event_type == QEvent.Type.KeyRelease:
-            try:
-                self.keyReleaseEvent(event)
-            except Exception:
-                pass
-            return True  # Event consumed
-        
-        # Block shortcut events to prevent accidental triggers
-        elif event_type == QEvent.Type.Shortcut:
-            return True
-
-        # Allow all mouse events - the dialog is modal so users can only interact with it anyway
-        return False
+                        sequence.append(('tap', keycode))
+                        sequence_list.addItem(ACTION_PREFIX['tap'] + keycode)
+                    return
+            # Not a quick tap, or no recorded press (edge case) — record release
+            sequence.append(('release', keycode))
+            sequence_list.addItem(ACTION_PREFIX['release'] + keycode)
+
+    def event(self, event):
+        # While recording, hand key events straight to our handlers so Tab
+        # and friends aren't used for focus navigation, and claim shortcut
+        # overrides so no shortcut fires instead of the key being recorded.
+        if self.recording:
+            event_type = event.type()
+            # One set lookup lets paint/mouse/timer events straight through
+            if event_type in self._INTERCEPTED_TYPES:
+                if event_type == self._SHORTCUT_OVERRIDE:
+                    event.accept()
+                # Held-key autorepeat bursts are swallowed without dispatching
+                elif not event.isAutoRepeat():
+                    if event_type == self._KEY_PRESS:
+                        self.keyPressEvent(event)
+                    else:
+                        self.keyReleaseEvent(event)
+                return True
+        return super().event(event)
 
     def accept(self):
-        # Ensure we stop filtering if the dialog is closed via OK
-        self._remove_event_filter()
+        # Ensure we release the keyboard if the dialog is closed via OK
+        self.releaseKeyboard()
         super().accept()
 
     def reject(self):
-        # Ensure we stop filtering if the dialog is closed via Cancel
-        self._remove_event_filter()
+        # Ensure we release the keyboard if the dialog is closed via Cancel
+        self.releaseKeyboard()
         super().reject()
 
+    def _sequence_full(self):
+        """Return True (and say so) once the recording hits MAX_MACRO_LEN."""
+        if len(self.sequence) < MAX_MACRO_LEN:
+            return False
+        self.instructions.setText(
+            f"Macro limit of {MAX_MACRO_LEN} actions reached. Press 'Stop' to finish."
+        )
+        return True
+
     def insert_text_string(self):
         """Allow user to insert a text string during macro recording."""
-        if not self.recording:
+        if not self.recording or self._sequence_full():
             return
         
-        # Temporarily pause event filtering so the input dialog can receive keyboard events
-        was_recording = self.recording
-        self.recording = False
-        self._remove_event_filter()
+        # Temporarily release the keyboard so the input dialog can receive keyboard events
+        self.releaseKeyboard()
         
-        from PyQt6.QtWidgets import QInputDialog
         text, ok = QInputDialog.getText(self, "Insert Text String", "Enter text to type:")
         
-        # Resume recording and event filtering
-        if was_recording:
-            self.recording = True
-            self._install_event_filter()
+        self._grab_keyboard()
         
         if ok and text:
             self.sequence.append(('text', text))
-            item_text = f"Text: {text}"
-            self.sequence_list.addItem(item_text)
+            self.sequence_list.addItem(ACTION_PREFIX['text'] + text)
 
     def insert_delay(self):
         """Allow user to insert a delay during macro recording."""
-        if not self.recording:
+        if not self.recording or self._sequence_full():
             return
         
-        # Temporarily pause event filtering so the input dialog can receive keyboard events
-        was_recording = self.recording
-        self.recording = False
-        self._remove_event_filter()
+        # Temporarily release the keyboard so the input dialog can receive keyboard events
+        self.releaseKeyboard()
         
-        from PyQt6.QtWidgets import QInputDialog
         delay_ms, ok = QInputDialog.getInt(
             self, "Insert Delay", "Enter delay in milliseconds:", 
             value=100, min=1, max=10000, step=50
         )
         
-        # Resume recording and event filtering
-        if was_recording:
-            self.recording = True
-            self._install_event_filter()
+        self._grab_keyboard()
         
         if ok:
             self.sequence.append(('delay', delay_ms))
-            self.sequence_list.addItem(f"Delay: {delay_ms}ms")
+            self.sequence_list.addItem(f"{ACTION_PREFIX['delay']}{delay_ms}ms")
 
     def get_sequence(self):
         """
@@ -1037,7 +1343,7 @@ class MacroRecorderDialog(QDialog):
         return self.sequence
 
     def closeEvent(self, event):
-        self._remove_event_filter()
+        self.releaseKeyboard()
         super().closeEvent(event)
 
 
@@ -1063,17 +1369,7 @@ class KeyCaptureDialog(QDialog):
         
         # Map numpad numbers to KP_ keycodes
         if is_numpad:
-            numpad_map = {
-                Qt.Key.Key_0: "KC.KP_0", Qt.Key.Key_1: "KC.KP_1", Qt.Key.Key_2: "KC.KP_2",
-                Qt.Key.Key_3: "KC.KP_3", Qt.Key.Key_4: "KC.KP_4", Qt.Key.Key_5: "KC.KP_5",
-                Qt.Key.Key_6: "KC.KP_6", Qt.Key.Key_7: "KC.KP_7", Qt.Key.Key_8: "KC.KP_8",
-                Qt.Key.Key_9: "KC.KP_9", Qt.Key.Key_Period: "KC.KP_DOT",
-                Qt.Key.Key_Slash: "KC.KP_SLASH", Qt.Key.Key_Asterisk: "KC.KP_ASTERISK",
-                Qt.Key.Key_Minus: "KC.KP_MINUS", Qt.Key.Key_Plus: "KC.KP_PLUS",
-                Qt.Key.Key_Enter: "KC.KP_ENTER", Qt.Key.Key_Equal: "KC.KP_EQUAL",
-                Qt.Key.Key_Comma: "KC.KP_COMMA",
-            }
-            keycode = numpad_map.get(key)
+            keycode = QT_NUMPAD_TO_KMK.get(key)
             if keycode:
                 self.captured = keycode
                 self.accept()
@@ -1110,15 +1406,15 @@ class MacroEditorDialog(QDialog):
         self.layout.addWidget(QLabel("Sequence:"))
         self.sequence_list = QListWidget()
         # Allow reordering actions via drag & drop
-        from PyQt6.QtWidgets import QAbstractItemView
         self.sequence_list.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         self.sequence_list.setDragEnabled(True)
         self.sequence_list.setAcceptDrops(True)
         self.sequence_list.setDropIndicatorShown(True)
         self.sequence_list.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
+        # Plain one-line text rows; lets the view skip per-row size measurement
+        self.sequence_list.setUniformItemSizes(True)
         if macro_sequence:
-            for action_type, value in macro_sequence:
-                self.sequence_list.addItem(f"{action_type.title()}: {value}")
+            self._set_sequence_items(macro_sequence)
         self.layout.addWidget(self.sequence_list)
         # Allow double-clicking an action to edit it
         self.sequence_list.itemDoubleClicked.connect(self.edit_action_item)
@@ -1180,14 +1476,47 @@ class MacroEditorDialog(QDialog):
         if dialog.exec():
             sequence = dialog.get_sequence()
             if sequence:
-                self.sequence_list.clear()
-                for action, value in sequence:
-                    self.sequence_list.addItem(f"{action.title()}: {value}")
+                self._set_sequence_items(sequence)
+
+    @staticmethod
+    def _action_entry(action_type, value):
+        """Return the (display text, UserRole data) pair for one action."""
+        value = str(value).strip()
+        prefix = ACTION_PREFIX.get(action_type) or f"{action_type.title()}: "
+        return prefix + value, (action_type.lower(), value)
+
+    def _set_action_item(self, item, action_type, value):
+        """Show an action on *item* and keep its parsed form in UserRole."""
+        text, data = self._action_entry(action_type, value)
+        item.setText(text)
+        item.setData(Qt.ItemDataRole.UserRole, data)
+
+    def _add_action_item(self, action_type, value):
+        item = QListWidgetItem()
+        self._set_action_item(item, action_type, value)
+        self.sequence_list.addItem(item)
+
+    def _set_sequence_items(self, sequence):
+        """Replace the action list with *sequence* in one batched update."""
+        entries = [self._action_entry(action, value) for action, value in sequence]
+        sequence_list = self.sequence_list
+        sequence_list.setUpdatesEnabled(False)
+        sequence_list.blockSignals(True)
+        try:
+            sequence_list.clear()
+            # One addItems call inserts every row at once; the parsed
+            # actions are then attached row by row
+            sequence_list.addItems([text for text, _ in entries])
+            for row, (_, data) in enumerate(entries):
+                sequence_list.item(row).setData(Qt.ItemDataRole.UserRole, data)
+        finally:
+            sequence_list.blockSignals(False)
+            sequence_list.setUpdatesEnabled(True)
 
     def add_text_action(self):
         text, ok = QInputDialog.getText(self, "Add Text Action", "Text to type:")
         if ok and text:
-            self.sequence_list.addItem(f"Text: {text}")
+            self._add_action_item('text', text)
 
     def add_tap_action(self):
         keycode = self._capture_keycode(
@@ -1195,7 +1524,7 @@ class MacroEditorDialog(QDialog):
             "Enter keycode manually (e.g., KC.A) if you did not press it."
         )
         if keycode:
-            self.sequence_list.addItem(f"Tap: {keycode}")
+            self._add_action_item('tap', keycode)
 
     def add_press_action(self):
         keycode = self._capture_keycode(
@@ -1203,7 +1532,7 @@ class MacroEditorDialog(QDialog):
             "Enter keycode manually (e.g., KC.LCTL) if you did not press it."
         )
         if keycode:
-            self.sequence_list.addItem(f"Press: {keycode}")
+            self._add_action_item('press', keycode)
 
     def add_release_action(self):
         keycode = self._capture_keycode(
@@ -1211,40 +1540,37 @@ class MacroEditorDialog(QDialog):
             "Enter keycode manually (e.g., KC.LCTL) if you did not press it."
         )
         if keycode:
-            self.sequence_list.addItem(f"Release: {keycode}")
+            self._add_action_item('release', keycode)
             
     def add_delay_action(self):
         delay, ok = QInputDialog.getInt(self, "Add Delay Action", "Milliseconds:", 100, 0, 10000)
         if ok:
-            self.sequence_list.addItem(f"Delay: {delay}")
+            self._add_action_item('delay', delay)
 
     def remove_selected_action(self):
-        for item in self.sequence_list.selectedItems():
-            self.sequence_list.takeItem(self.sequence_list.row(item))
+        # Single selection: the current row is the selected item, no row() scan.
+        row = self.sequence_list.currentRow()
+        if row >= 0 and self.sequence_list.item(row).isSelected():
+            self.sequence_list.takeItem(row)
 
     def edit_action_item(self, item):
         if not item:
             return
-        text = item.text()
-        if ':' not in text:
-            return
-        action_type, value = text.split(':', 1)
-        action_type = action_type.strip().lower()
-        value = value.strip()
+        action_type, value = item.data(Qt.ItemDataRole.UserRole)
 
         if action_type in ('tap', 'press', 'release', 'text'):
             # For key-like actions and text, open key capture for key or input for text
             if action_type == 'text':
                 new_text, ok = QInputDialog.getText(self, "Edit Text Action", "Text to type:", text=value)
                 if ok:
-                    item.setText(f"Text: {new_text}")
+                    self._set_action_item(item, 'text', new_text)
             else:
                 # Open capture dialog to press the desired key
                 dlg = KeyCaptureDialog(self)
                 if dlg.exec():
                     captured = dlg.captured
                     if captured:
-                        item.setText(f"{action_type.title()}: {captured}")
+                        self._set_action_item(item, action_type, captured)
 
         elif action_type == 'delay':
             # edit delay value
@@ -1254,14 +1580,12 @@ class MacroEditorDialog(QDialog):
                 current = 100
             new_delay, ok = QInputDialog.getInt(self, "Edit Delay", "Milliseconds:", current, 0, 60000)
             if ok:
-                item.setText(f"Delay: {new_delay}")
+                self._set_action_item(item, 'delay', new_delay)
             
     def get_data(self):
-        sequence = []
-        for i in range(self.sequence_list.count()):
-            item_text = self.sequence_list.item(i).text()
-            action_type, value = item_text.split(":", 1)
-            sequence.append((action_type.lower().strip(), value.strip()))
+        sequence_list = self.sequence_list
+        role = Qt.ItemDataRole.UserRole
+        sequence = [sequence_list.item(i).data(role) for i in range(sequence_list.count())]
         
         macro_name = self.name_input.text().strip().upper().replace(" ", "_")
         if not macro_name or not macro_name.isidentifier():
@@ -1280,30 +1604,10 @@ class PinEditorDialog(QDialog):
         main_layout = QVBoxLayout(self)
         pin_groups_layout = QHBoxLayout()
         
-        col_group = QGroupBox("Column Pins")
-        col_layout = QGridLayout()
-        self.col_pin_inputs = []
-        for i in range(cols):
-            col_layout.addWidget(QLabel(f"Col {i}:"), i, 0)
-            line_edit = QLineEdit()
-            if i < len(col_pins):
-                line_edit.setText(col_pins[i])
-            self.col_pin_inputs.append(line_edit)
-            col_layout.addWidget(line_edit, i, 1)
-        col_group.setLayout(col_layout)
+        col_group, self.col_pin_inputs = self._build_pin_group("Column Pins", "Col", cols, col_pins)
         pin_groups_layout.addWidget(col_group)
 
-        row_group = QGroupBox("Row Pins")
-        row_layout = QGridLayout()
-        self.row_pin_inputs = []
-        for i in range(rows):
-            row_layout.addWidget(QLabel(f"Row {i}:"), i, 0)
-            line_edit = QLineEdit()
-            if i < len(row_pins):
-                line_edit.setText(row_pins[i])
-            self.row_pin_inputs.append(line_edit)
-            row_layout.addWidget(line_edit, i, 1)
-        row_group.setLayout(row_layout)
+        row_group, self.row_pin_inputs = self._build_pin_group("Row Pins", "Row", rows, row_pins)
         pin_groups_layout.addWidget(row_group)
         
         main_layout.addLayout(pin_groups_layout)
@@ -1313,12 +1617,118 @@ class PinEditorDialog(QDialog):
         button_box.rejected.connect(self.reject)
         main_layout.addWidget(button_box)
 
+    @staticmethod
+    def _build_pin_group(title, label, count, pins):
+        """Build a group box of labelled pin inputs, returning (group, inputs)."""
+        group = QGroupBox(title)
+        # Create every widget up front, then fill the layout in one burst
+        # with repaints held off.
+        group.setUpdatesEnabled(False)
+        labels = [QLabel(f"{label} {i}:") for i in range(count)]
+        inputs = [QLineEdit(pins[i] if i < len(pins) else "") for i in range(count)]
+        layout = QGridLayout()
+        for i, (pin_label, line_edit) in enumerate(zip(labels, inputs)):
+            layout.addWidget(pin_label, i, 0)
+            layout.addWidget(line_edit, i, 1)
+        group.setLayout(layout)
+        group.setUpdatesEnabled(True)
+        return group, inputs
+
     def get_pins(self):
         col_pins = [widget.text().strip() for widget in self.col_pin_inputs]
         row_pins = [widget.text().strip() for widget in self.row_pin_inputs]
         return col_pins, row_pins
 
 
+# Encoder dialog presets: the layer-cycling rotation choice, the fixed
+# (CCW, CW) keycodes of the other rotation choices, and the fixed button keycodes
+ENCODER_LAYER_CYCLE = "Cycle Layers (Recommended)"
+ENCODER_ROTATION_KEYCODES = {
+    "Volume Control (Vol Down / Vol Up)": ("KC.VOLD", "KC.VOLU"),
+    "Brightness (Down / Up)": ("KC.BRID", "KC.BRIU"),
+    "Media (Prev Track / Next Track)": ("KC.MPRV", "KC.MNXT"),
+}
+ENCODER_BUTTON_KEYCODES = {
+    "Toggle Layer 1": "KC.TG(1)",
+    "Mute": "KC.MUTE",
+    "Play/Pause": "KC.MPLY",
+}
+ENCODER_CONFIG_HEADER = (
+    "# --- Rotary Encoder Configuration ---",
+    "from kmk.modules.encoder import EncoderHandler",
+    "",
+)
+
+
+def build_encoder_config(
+    rotation: str,
+    invert: bool,
+    divisor: int,
+    num_layers: int,
+    custom_ccw: str,
+    custom_cw: str,
+    button: str,
+    custom_press: str,
+) -> str:
+    """Assemble the encoder configuration code for the given dialog state."""
+    pins_line = f"encoder_handler.pins = ((board.GP10, board.GP11, board.GP14, {invert}),)"
+
+    if rotation == ENCODER_LAYER_CYCLE:
+        # Layer cycling uses our custom keys (see LayerCycler) and KC.TO()
+        lines = [
+            *ENCODER_CONFIG_HEADER,
+            "# Encoder configuration with layer cycling using KC.TO()",
+            "encoder_handler = EncoderHandler()",
+            f"encoder_handler.divisor = {divisor}",
+            pins_line,
+            "",
+            "# Build encoder map for each layer",
+            "# Each layer's encoder: (CCW action, CW action, Button press action)",
+            "encoder_map = []",
+            f"for i in range({num_layers}):",
+            f"    next_layer = (i + 1) % {num_layers}",
+            f"    prev_layer = (i - 1) % {num_layers}",
+            "    # CCW=prev layer, CW=next layer, Press=layer 0",
+            "    encoder_map.append(((KC.TO(prev_layer), KC.TO(next_layer), KC.TO(0)),))",
+            "",
+            "encoder_handler.map = encoder_map",
+            "keyboard.modules.append(encoder_handler)",
+            "",
+            "# Initialize layer cycler after keymap is defined",
+            "# NOTE: Add this line AFTER keyboard.keymap = [...] in your code.py:",
+            "# layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))",
+        ]
+        return "\n".join(lines)
+
+    # Rotation actions, swapped if inverted
+    preset = ENCODER_ROTATION_KEYCODES.get(rotation)
+    if preset:
+        ccw_action, cw_action = preset
+    else:  # Custom
+        ccw_action = custom_ccw or "KC.NO"
+        cw_action = custom_cw or "KC.NO"
+    if invert:
+        ccw_action, cw_action = cw_action, ccw_action
+
+    # Button action; there is no custom reset key without layer cycling
+    if button == "Reset to Layer 0 (Recommended)":
+        press_action = "KC.NO"
+    else:
+        press_action = ENCODER_BUTTON_KEYCODES.get(button) or custom_press or "KC.NO"
+
+    lines = [
+        *ENCODER_CONFIG_HEADER,
+        "# Configure encoder",
+        "encoder_handler = EncoderHandler()",
+        f"encoder_handler.divisor = {divisor}",
+        pins_line,
+        f"encoder_handler.map = [(({ccw_action}, {cw_action}, {press_action}),)]",
+        "keyboard.modules.append(encoder_handler)",
+        "",
+    ]
+    return "\n".join(lines)
+
+
 class EncoderConfigDialog(QDialog):
     """Enhanced encoder configuration dialog with automatic layer cycling and display updates."""
     def __init__(self, parent=None, initial_text="", num_layers=1, initial_divisor=4):
@@ -1455,95 +1865,16 @@ class EncoderConfigDialog(QDialog):
 
     def get_config(self):
         """Generate encoder configuration code"""
-        lines = []
-        lines.append("# --- Rotary Encoder Configuration ---")
-        lines.append("from kmk.modules.encoder import EncoderHandler")
-        lines.append("")
-        
-        # Determine rotation actions
-        rotation = self.rotation_action.currentText()
-        invert = self.invert_direction.isChecked()
-        
-        if rotation == "Cycle Layers (Recommended)":
-            ccw_action = "KC.LAYER_PREV"
-            cw_action = "KC.LAYER_NEXT"
-        elif rotation == "Volume Control (Vol Down / Vol Up)":
-            ccw_action = "KC.VOLD"
-            cw_action = "KC.VOLU"
-        elif rotation == "Brightness (Down / Up)":
-            ccw_action = "KC.BRID"
-            cw_action = "KC.BRIU"
-        elif rotation == "Media (Prev Track / Next Track)":
-            ccw_action = "KC.MPRV"
-            cw_action = "KC.MNXT"
-        else:  # Custom
-            ccw_action = self.custom_ccw.text().strip() or "KC.NO"
-            cw_action = self.custom_cw.text().strip() or "KC.NO"
-        
-        # Swap if inverted
-        if invert:
-            ccw_action, cw_action = cw_action, ccw_action
-        
-        # For layer cycling, use our custom keys instead of KC references
-        if rotation == "Cycle Layers (Recommended)":
-            if invert:
-                ccw_action = "LAYER_NEXT_KEY"
-                cw_action = "LAYER_PREV_KEY"
-            else:
-                ccw_action = "LAYER_PREV_KEY"
-                cw_action = "LAYER_NEXT_KEY"
-        
-        # Determine button action
-        button = self.button_action.currentText()
-        if button == "Reset to Layer 0 (Recommended)":
-            if rotation == "Cycle Layers (Recommended)":
-                press_action = "LAYER_RESET_KEY"
-            else:
-                press_action = "KC.NO"  # No custom reset if not using layer cycling
-        elif button == "Toggle Layer 1":
-            press_action = "KC.TG(1)"
-        elif button == "Mute":
-            press_action = "KC.MUTE"
-        elif button == "Play/Pause":
-            press_action = "KC.MPLY"
-        else:  # Custom
-            press_action = self.custom_press.text().strip() or "KC.NO"
-        
-        # Generate layer cycler if needed
-        if rotation == "Cycle Layers (Recommended)":
-            lines.append("# Encoder configuration with layer cycling using KC.TO()")
-            lines.append("encoder_handler = EncoderHandler()")
-            lines.append(f"encoder_handler.divisor = {self.divisor_spin.value()}")
-            lines.append(f"encoder_handler.pins = ((board.GP10, board.GP11, board.GP14, {invert}),)")
-            lines.append("")
-            lines.append("# Build encoder map for each layer")
-            lines.append("# Each layer's encoder: (CCW action, CW action, Button press action)")
-            lines.append("encoder_map = []")
-            lines.append(f"for i in range({self.num_layers}):")
-            lines.append(f"    next_layer = (i + 1) % {self.num_layers}")
-            lines.append(f"    prev_layer = (i - 1) % {self.num_layers}")
-            lines.append(f"    # CCW=prev layer, CW=next layer, Press=layer 0")
-            lines.append(f"    encoder_map.append(((KC.TO(prev_layer), KC.TO(next_layer), KC.TO(0)),))")
-            lines.append("")
-            lines.append("encoder_handler.map = encoder_map")
-            lines.append("keyboard.modules.append(encoder_handler)")
-            lines.append("")
-        else:
-            # Non-layer cycling modes
-            lines.append("# Configure encoder")
-            lines.append("encoder_handler = EncoderHandler()")
-            lines.append(f"encoder_handler.divisor = {self.divisor_spin.value()}")
-            lines.append(f"encoder_handler.pins = ((board.GP10, board.GP11, board.GP14, {invert}),)")
-            lines.append(f"encoder_handler.map = [(({ccw_action}, {cw_action}, {press_action}),)]")
-            lines.append("keyboard.modules.append(encoder_handler)")
-            lines.append("")
-        
-        if rotation == "Cycle Layers (Recommended)":
-            lines.append("# Initialize layer cycler after keymap is defined")
-            lines.append("# NOTE: Add this line AFTER keyboard.keymap = [...] in your code.py:")
-            lines.append(f"# layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))")
-        
-        return "\n".join(lines)
+        return build_encoder_config(
+            self.rotation_action.currentText(),
+            self.invert_direction.isChecked(),
+            self.divisor_spin.value(),
+            self.num_layers,
+            self.custom_ccw.text().strip(),
+            self.custom_cw.text().strip(),
+            self.button_action.currentText(),
+            self.custom_press.text().strip(),
+        )
 
     def get_divisor(self) -> int:
         return self.divisor_spin.value()
@@ -1676,7 +2007,10 @@ class AnalogInConfigDialog(QDialog):
         sender = self.sender()
         
         if sender == self.mode_volume and self.mode_volume.isChecked():
+            # Uncheck the other mode without re-entering this handler
+            self.mode_brightness.blockSignals(True)
             self.mode_brightness.setChecked(False)
+            self.mode_brightness.blockSignals(False)
             self.step_size_label.setEnabled(True)
             self.step_size_spin.setEnabled(True)
             self.min_brightness_label.setEnabled(False)
@@ -1684,7 +2018,9 @@ class AnalogInConfigDialog(QDialog):
             self.max_brightness_label.setEnabled(False)
             self.max_brightness_spin.setEnabled(False)
         elif sender == self.mode_brightness and self.mode_brightness.isChecked():
+            self.mode_volume.blockSignals(True)
             self.mode_volume.setChecked(False)
+            self.mode_volume.blockSignals(False)
             self.step_size_label.setEnabled(False)
             self.step_size_spin.setEnabled(False)
             self.min_brightness_label.setEnabled(True)
@@ -2035,9 +2371,83 @@ class PegRgbConfigDialog(QDialog):
         return result
 
 
+# Keycode category tests used by the RGB color presets. Each takes an
+# upper-cased keycode; suffix checks are set lookups on the last two chars and
+# substring checks are a single precompiled regex search.
+_BASIC_KEY_SUFFIXES = frozenset(f".{c}" for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+_WASD_KEY_SUFFIXES = frozenset((".W", ".A", ".S", ".D"))
+_MODIFIER_KEY_RE = re.compile("LSHIFT|RSHIFT|LCTRL|RCTRL|LALT|RALT|LGUI|RGUI")
+_NAVIGATION_KEY_RE = re.compile("HOME|END|PGUP|PGDN|INS|DEL")
+_FUNCTION_KEY_RE = re.compile(r"F[1-9]")  # any of F1..F24
+_MEDIA_KEY_RE = re.compile("MUTE|VOLU|VOLD|MPLY|MSTP|MNXT|MPRV")
+_MOUSE_KEY_RE = re.compile("MS_|MW_|MB_")
+_LAYER_KEY_RE = re.compile(r"MO\(|TO\(|TG\(|DF\(|LT\(")
+# Only arrow keys, not page up/down or home/end (RIGHT is RGHT in KMK)
+_ARROW_KEY_SUFFIXES = (".UP", ".DOWN", ".LEFT", ".RGHT")
+# Keycodes matched by each fine-grained RGB preset
+GRANULAR_KEY_SETS = {
+    "numbers": frozenset(('KC.N1', 'KC.N2', 'KC.N3', 'KC.N4', 'KC.N5', 'KC.N6', 'KC.N7', 'KC.N8', 'KC.N9', 'KC.N0')),
+    "letters": frozenset(f"KC.{c}" for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"),
+    "space": frozenset(('KC.SPC', 'KC.SPACE')),
+    "enter": frozenset(('KC.ENT', 'KC.ENTER', 'KC.KP_ENTER')),
+    "backspace": frozenset(('KC.BSPC', 'KC.DEL', 'KC.BACKSPACE', 'KC.DELETE')),
+    "tab": frozenset(('KC.TAB',)),
+    "shift": frozenset(('KC.LSFT', 'KC.RSFT', 'KC.LSHIFT', 'KC.RSHIFT')),
+    "ctrl": frozenset(('KC.LCTL', 'KC.RCTL', 'KC.LCTRL', 'KC.RCTRL')),
+    "alt": frozenset(('KC.LALT', 'KC.RALT')),
+    "keypad_nums": frozenset(('KC.KP_0', 'KC.KP_1', 'KC.KP_2', 'KC.KP_3', 'KC.KP_4', 'KC.KP_5', 'KC.KP_6', 'KC.KP_7', 'KC.KP_8', 'KC.KP_9')),
+    "keypad_nav": frozenset(('KC.KP_DOT', 'KC.KP_0', 'KC.KP_1', 'KC.KP_2', 'KC.KP_3', 'KC.KP_4', 'KC.KP_5', 'KC.KP_6', 'KC.KP_7', 'KC.KP_8', 'KC.KP_9')),
+    "keypad_ops": frozenset(('KC.KP_SLASH', 'KC.KP_ASTERISK', 'KC.KP_MINUS', 'KC.KP_PLUS', 'KC.KP_ENTER', 'KC.KP_DOT', 'KC.KP_EQUAL', 'KC.KP_COMMA', 'KC.NUMLOCK')),
+}
+KEY_CATEGORY_MATCHERS = {
+    "macro": lambda key: key.startswith("MACRO("),
+    "basic": lambda key: key[-2:] in _BASIC_KEY_SUFFIXES,
+    "modifiers": lambda key: _MODIFIER_KEY_RE.search(key) is not None,
+    "navigation": lambda key: _NAVIGATION_KEY_RE.search(key) is not None,
+    "function": lambda key: _FUNCTION_KEY_RE.search(key) is not None,
+    "media": lambda key: _MEDIA_KEY_RE.search(key) is not None,
+    "mouse": lambda key: _MOUSE_KEY_RE.search(key) is not None,
+    "layers": lambda key: _LAYER_KEY_RE.search(key) is not None,
+    "wasd": lambda key: key[-2:] in _WASD_KEY_SUFFIXES,
+    "arrows": lambda key: key.endswith(_ARROW_KEY_SUFFIXES),
+}
+
+
 class PerKeyColorDialog(QDialog):
     """Dialog to assign static per-key and underglow colors for Peg RGB Matrix."""
 
+    # Key button stylesheets: unset, and colored (background, text color)
+    _KEY_STYLE_DEFAULT = "font-size: 12px; padding: 4px;"
+    _KEY_STYLE_COLORED = "background-color: %s; color: %s; font-size: 12px; padding: 4px;"
+    # Hover highlight for key/underglow buttons, resolved natively by Qt
+    _LED_BUTTON_QSS = "QPushButton#ledButton:hover { border: 2px solid rgba(0, 0, 0, 0.35); }"
+    # Default category preset colors - vibrant and highly distinctive (no overlap with granular colors)
+    _DEFAULT_CATEGORY_COLORS = {
+        "macro": "#FF0066",      # Electric Pink
+        "basic": "#00FFFF",      # Aqua/Cyan
+        "modifiers": "#00FF00",  # Pure Green
+        "navigation": "#FFCC00", # Amber
+        "function": "#9933FF",   # Vivid Purple
+        "media": "#FF5500",      # Bright Orange
+        "mouse": "#FF66CC",      # Bright Pink
+        "layers": "#66FF00",     # Bright Lime
+        "wasd": "#FF0099",       # Magenta Pink
+        "arrows": "#0099FF",     # Bright Blue
+    }
+    # (category, label) in preset row order
+    _CATEGORY_LABELS = (
+        ("macro", "Macros"),
+        ("basic", "Basic"),
+        ("modifiers", "Modifiers"),
+        ("navigation", "Navigation"),
+        ("function", "Function"),
+        ("media", "Media"),
+        ("mouse", "Mouse"),
+        ("layers", "Layers"),
+        ("wasd", "WASD Keys"),
+        ("arrows", "Arrow Keys"),
+    )
+
     def __init__(
         self,
         parent=None,
@@ -2052,6 +2462,7 @@ class PerKeyColorDialog(QDialog):
     ):
         super().__init__(parent)
         self.setWindowTitle("RGB Matrix Colors")
+        self.setStyleSheet(self._LED_BUTTON_QSS)
         self.rows = rows
         self.cols = cols
         self.underglow_count = max(0, underglow_count)
@@ -2061,13 +2472,17 @@ class PerKeyColorDialog(QDialog):
 
         key_default = ensure_hex_prefix(default_key_color, "#FFFFFF")
         under_default = ensure_hex_prefix(default_underglow_color, "#000000")
+        # Colors are keyed by int LED index here; string keys (as stored in
+        # the config) are only used on the way in and out of the dialog.
         self.key_colors = {
-            str(k): ensure_hex_prefix(v, key_default)
+            int(k): ensure_hex_prefix(v, key_default)
             for k, v in (key_colors or {}).items()
+            if str(k).isdigit()
         }
         self.underglow_colors = {
-            str(k): ensure_hex_prefix(v, under_default)
+            int(k): ensure_hex_prefix(v, under_default)
             for k, v in (underglow_colors or {}).items()
+            if str(k).isdigit()
         }
 
         self.fill_color = key_default
@@ -2117,7 +2532,7 @@ class PerKeyColorDialog(QDialog):
         self._make_key_buttons()
 
         # Underglow controls
-        under_group = QGroupBox(f"Underglow LEDs ({self.underglow_count})")
+        under_group = self.under_group = QGroupBox(f"Underglow LEDs ({self.underglow_count})")
         under_layout = QVBoxLayout(under_group)
 
         under_controls = QHBoxLayout()
@@ -2142,14 +2557,11 @@ class PerKeyColorDialog(QDialog):
             for idx in range(self.underglow_count):
                 btn = QPushButton(f"U{idx}")
                 btn.setFixedSize(60, 40)
+                btn.setObjectName("ledButton")
                 btn.setStyleSheet("font-size: 12px;")
                 btn.clicked.connect(lambda _, i=idx: self.on_underglow_clicked(i))
                 self.underglow_buttons.append(btn)
                 grid.addWidget(btn, idx // 8, idx % 8)
-                try:
-                    self._install_hover_effect(btn)
-                except Exception:
-                    pass
             under_layout.addLayout(grid)
         else:
             under_layout.addWidget(QLabel("No underglow LEDs configured."))
@@ -2159,8 +2571,6 @@ class PerKeyColorDialog(QDialog):
         content_layout.addWidget(left_widget, stretch=1)
 
         # RIGHT SIDE: presets reused from legacy dialog
-        from PyQt6.QtWidgets import QScrollArea
-
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
         scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
@@ -2172,66 +2582,15 @@ class PerKeyColorDialog(QDialog):
         settings = load_settings()
         saved_colors = settings.get('rgb_category_colors', {})
         
-        # Default colors - vibrant and highly distinctive (no overlap with granular colors)
-        default_colors = {
-            "macro": "#FF0066",      # Electric Pink
-            "basic": "#00FFFF",      # Aqua/Cyan
-            "modifiers": "#00FF00",  # Pure Green
-            "navigation": "#FFCC00", # Amber
-            "function": "#9933FF",   # Vivid Purple
-            "media": "#FF5500",      # Bright Orange
-            "mouse": "#FF66CC",      # Bright Pink
-            "layers": "#66FF00",     # Bright Lime
-            "wasd": "#FF0099",       # Magenta Pink
-            "arrows": "#0099FF",     # Bright Blue
-        }
-        
         # Merge saved colors with defaults
-        self.category_colors = {**default_colors, **saved_colors}
-
-        category_labels = {
-            "macro": "Macros",
-            "basic": "Basic",
-            "modifiers": "Modifiers",
-            "navigation": "Navigation",
-            "function": "Function",
-            "media": "Media",
-            "mouse": "Mouse",
-            "layers": "Layers",
-            "wasd": "WASD Keys",
-            "arrows": "Arrow Keys",
-        }
+        self.category_colors = {**self._DEFAULT_CATEGORY_COLORS, **saved_colors}
 
+        # The preset rows are built on first show (see _build_category_rows)
         preset_group = QGroupBox("Keycode Category Presets")
-        preset_grid = QGridLayout(preset_group)
-        row = 0
-        for cat_key, cat_label in category_labels.items():
-            preset_grid.addWidget(QLabel(f"{cat_label}:"), row, 0)
-
-            color_btn = QPushButton()
-            color_btn.setFixedSize(25, 25)
-            color_btn.setStyleSheet(f"background-color: {self.category_colors[cat_key]};")
-            color_btn.clicked.connect(lambda _, k=cat_key: self.pick_category_color(k))
-            setattr(self, f"{cat_key}_color_btn", color_btn)
-            preset_grid.addWidget(color_btn, row, 1)
-
-            apply_btn = QPushButton("Apply")
-            apply_btn.setMaximumWidth(60)
-            apply_btn.clicked.connect(lambda _, k=cat_key: self.apply_category_color(k))
-            preset_grid.addWidget(apply_btn, row, 2)
-            row += 1
-        
-        # Add Apply All and Reset buttons at the bottom
-        preset_grid.addWidget(QLabel(""), row, 0)  # Spacer
-        
-        apply_all_btn = QPushButton("Apply All Categories")
-        apply_all_btn.setStyleSheet("font-weight: bold; padding: 8px;")
-        apply_all_btn.clicked.connect(self.apply_all_categories)
-        preset_grid.addWidget(apply_all_btn, row + 1, 0, 1, 3)
-        
-        reset_btn = QPushButton("Reset to Default Colors")
-        reset_btn.clicked.connect(self.reset_category_colors)
-        preset_grid.addWidget(reset_btn, row + 2, 0, 1, 3)
+        self._preset_grid = QGridLayout(preset_group)
+        self._categories_built = False
+        # Layer index -> {category: [key indices]}, see _classify_layer
+        self._layer_category_cache = {}
 
         presets_layout.addWidget(preset_group)
 
@@ -2311,111 +2670,130 @@ class PerKeyColorDialog(QDialog):
         self.refresh_key_buttons()
         self.refresh_underglow_buttons()
 
+    def showEvent(self, event):
+        # The keymap may have been edited while the dialog was hidden
+        self._layer_category_cache.clear()
+        if not self._categories_built:
+            self._build_category_rows()
+        super().showEvent(event)
+
+    def _build_category_rows(self):
+        """Create the category preset rows; deferred until the dialog is shown."""
+        self._categories_built = True
+        preset_grid = self._preset_grid
+        row = 0
+        for cat_key, cat_label in self._CATEGORY_LABELS:
+            preset_grid.addWidget(QLabel(f"{cat_label}:"), row, 0)
+
+            color_btn = QPushButton()
+            color_btn.setFixedSize(25, 25)
+            color_btn.setStyleSheet(f"background-color: {self.category_colors[cat_key]};")
+            color_btn.clicked.connect(lambda _, k=cat_key: self.pick_category_color(k))
+            setattr(self, f"{cat_key}_color_btn", color_btn)
+            preset_grid.addWidget(color_btn, row, 1)
+
+            apply_btn = QPushButton("Apply")
+            apply_btn.setMaximumWidth(60)
+            apply_btn.clicked.connect(lambda _, k=cat_key: self.apply_category_color(k))
+            preset_grid.addWidget(apply_btn, row, 2)
+            row += 1
+
+        # Add Apply All and Reset buttons at the bottom
+        preset_grid.addWidget(QLabel(""), row, 0)  # Spacer
+
+        apply_all_btn = QPushButton("Apply All Categories")
+        apply_all_btn.setStyleSheet("font-weight: bold; padding: 8px;")
+        apply_all_btn.clicked.connect(self.apply_all_categories)
+        preset_grid.addWidget(apply_all_btn, row + 1, 0, 1, 3)
+
+        reset_btn = QPushButton("Reset to Default Colors")
+        reset_btn.clicked.connect(self.reset_category_colors)
+        preset_grid.addWidget(reset_btn, row + 2, 0, 1, 3)
+
     def _make_key_buttons(self):
         self.key_buttons = []
         self.key_button_indices = []
+        # Color each button was last rendered with; False forces the first render
+        self._rendered_key_colors = []
         for r in range(self.rows):
             for c in range(self.cols):
                 key_idx = self._key_index_for_position(r, c)
                 btn = QPushButton(f"{key_idx}")
                 btn.setFixedSize(64, 56)
-                btn.setStyleSheet("font-size: 12px; padding: 4px;")
+                btn.setObjectName("ledButton")
+                btn.setStyleSheet(self._KEY_STYLE_DEFAULT)
+                btn.setProperty("key_index", key_idx)
                 btn.clicked.connect(self.on_key_clicked)
                 self.key_buttons.append(btn)
                 self.key_button_indices.append(key_idx)
+                self._rendered_key_colors.append(False)
                 self.grid_layout.addWidget(btn, r, c)
-                try:
-                    self._install_hover_effect(btn)
-                except Exception:
-                    pass
 
     def _key_index_for_position(self, display_row: int, display_col: int) -> int:
         logical_row = self.rows - 1 - display_row
         logical_col = self.cols - 1 - display_col
         return logical_row * self.cols + logical_col
 
-    def _install_hover_effect(self, button: QPushButton):
-        if hasattr(button, "_hover_filter"):
-            return
-        anim = QPropertyAnimation(button, b"geometry")
-        anim.setDuration(140)
-        anim.setEasingCurve(QEasingCurve.Type.OutCubic)
-        button._hover_anim = anim
-        shadow = QGraphicsDropShadowEffect(button)
-        shadow.setBlurRadius(8)
-        shadow.setOffset(0, 2)
-        shadow.setColor(QColor("#00000033"))
-        button.setGraphicsEffect(shadow)
-
-        class _Filter(QObject):
-            def __init__(self, btn, animation):
-                super().__init__(btn)
-                self.btn = btn
-                self.anim = animation
-
-            def eventFilter(self, obj, event):
-                if event.type() == QEvent.Type.Enter:
-                    g = self.btn.geometry()
-                    self.anim.stop()
-                    self.anim.setStartValue(g)
-                    self.anim.setEndValue(g.adjusted(-4, -3, 4, 3))
-                    self.anim.start()
-                elif event.type() == QEvent.Type.Leave:
-                    g = self.btn.geometry()
-                    self.anim.stop()
-                    self.anim.setStartValue(g)
-                    self.anim.setEndValue(g.adjusted(4, 3, -4, -3))
-                    self.anim.start()
-                return False
-
-        filt = _Filter(button, anim)
-        button.installEventFilter(filt)
-        button._hover_filter = filt
+    @contextmanager
+    def _batched_update(self, widget):
+        """Hold off repaints of *widget* so a burst of restyles paints once."""
+        widget.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            widget.setUpdatesEnabled(True)
 
     def refresh_key_buttons(self):
-        for idx, btn in enumerate(self.key_buttons):
-            key_idx = self.key_button_indices[idx]
-            color = self.key_colors.get(str(key_idx))
-            if color:
-                rgb = hex_to_rgb_list(color)
-                luminance = 0.299 * rgb[0] + 0.587 * rgb[1] + 0.114 * rgb[2]
-                text_color = "#000000" if luminance > 150 else "#FFFFFF"
-                btn.setStyleSheet(f"background-color: {color}; color: {text_color}; font-size: 12px; padding: 4px;")
-                btn.setToolTip(f"Index: {key_idx}\nColor: {color}")
-            else:
-                btn.setStyleSheet("font-size: 12px; padding: 4px;")
-                btn.setToolTip(f"Index: {key_idx}\nColor: (default)")
+        rendered = self._rendered_key_colors
+        key_colors = self.key_colors
+        with self._batched_update(self.grid_widget):
+            for idx, btn in enumerate(self.key_buttons):
+                key_idx = self.key_button_indices[idx]
+                color = key_colors.get(key_idx)
+                # Only restyle buttons whose color changed since the last refresh
+                if rendered[idx] == color:
+                    continue
+                rendered[idx] = color
+                if color:
+                    rgb = hex_to_rgb_list(color)
+                    luminance = 0.299 * rgb[0] + 0.587 * rgb[1] + 0.114 * rgb[2]
+                    text_color = "#000000" if luminance > 150 else "#FFFFFF"
+                    btn.setStyleSheet(self._KEY_STYLE_COLORED % (color, text_color))
+                    btn.setToolTip(f"Index: {key_idx}\nColor: {color}")
+                else:
+                    btn.setStyleSheet(self._KEY_STYLE_DEFAULT)
+                    btn.setToolTip(f"Index: {key_idx}\nColor: (default)")
 
     def refresh_underglow_buttons(self):
-        for idx, btn in enumerate(self.underglow_buttons):
-            color = self.underglow_colors.get(str(idx))
-            if color:
-                rgb = hex_to_rgb_list(color)
-                luminance = 0.299 * rgb[0] + 0.587 * rgb[1] + 0.114 * rgb[2]
-                text_color = "#000000" if luminance > 150 else "#FFFFFF"
-                btn.setStyleSheet(f"background-color: {color}; color: {text_color}; font-size: 12px;")
-                btn.setToolTip(f"Underglow {idx}: {color}")
-            else:
-                btn.setStyleSheet("font-size: 12px;")
-                btn.setToolTip(f"Underglow {idx}: (default)")
+        with self._batched_update(self.under_group):
+            for idx, btn in enumerate(self.underglow_buttons):
+                color = self.underglow_colors.get(idx)
+                if color:
+                    rgb = hex_to_rgb_list(color)
+                    luminance = 0.299 * rgb[0] + 0.587 * rgb[1] + 0.114 * rgb[2]
+                    text_color = "#000000" if luminance > 150 else "#FFFFFF"
+                    btn.setStyleSheet(f"background-color: {color}; color: {text_color}; font-size: 12px;")
+                    btn.setToolTip(f"Underglow {idx}: {color}")
+                else:
+                    btn.setStyleSheet("font-size: 12px;")
+                    btn.setToolTip(f"Underglow {idx}: (default)")
 
     def on_key_clicked(self):
         btn = self.sender()
-        if btn not in self.key_buttons:
+        key_idx = btn.property("key_index") if btn is not None else None
+        if key_idx is None:
             return
-        idx = self.key_buttons.index(btn)
-        key_idx = self.key_button_indices[idx]
         color = QColorDialog.getColor(QColor(self.fill_color), self, "Select key color")
         if color.isValid():
             hexc = ensure_hex_prefix(color.name(), self.fill_color)
-            self.key_colors[str(key_idx)] = hexc
+            self.key_colors[key_idx] = hexc
             self.refresh_key_buttons()
 
     def on_underglow_clicked(self, index: int):
         color = QColorDialog.getColor(QColor(self.underglow_fill_color), self, "Select underglow color")
         if color.isValid():
             hexc = ensure_hex_prefix(color.name(), self.underglow_fill_color)
-            self.underglow_colors[str(index)] = hexc
+            self.underglow_colors[index] = hexc
             self.refresh_underglow_buttons()
 
     def clear_key_colors(self):
@@ -2424,7 +2802,7 @@ class PerKeyColorDialog(QDialog):
 
     def fill_key_colors(self):
         for idx in range(self.rows * self.cols):
-            self.key_colors[str(idx)] = self.fill_color
+            self.key_colors[idx] = self.fill_color
         self.refresh_key_buttons()
 
     def pick_fill_color(self):
@@ -2439,7 +2817,7 @@ class PerKeyColorDialog(QDialog):
 
     def fill_underglow_colors(self):
         for idx in range(self.underglow_count):
-            self.underglow_colors[str(idx)] = self.underglow_fill_color
+            self.underglow_colors[idx] = self.underglow_fill_color
         self.refresh_underglow_buttons()
 
     def pick_underglow_fill_color(self):
@@ -2474,7 +2852,7 @@ class PerKeyColorDialog(QDialog):
         keys_to_color = self.get_keys_for_category(category)
         
         for key_idx in keys_to_color:
-            self.key_colors[str(key_idx)] = color
+            self.key_colors[key_idx] = color
         
         self.refresh_key_buttons()
     
@@ -2484,7 +2862,7 @@ class PerKeyColorDialog(QDialog):
             keys_to_color = self.get_keys_for_category(category)
             color = self.category_colors[category]
             for key_idx in keys_to_color:
-                self.key_colors[str(key_idx)] = color
+                self.key_colors[key_idx] = color
         
         self.refresh_key_buttons()
         ToastNotification.show_message(
@@ -2556,18 +2934,28 @@ class PerKeyColorDialog(QDialog):
         if current_layer >= len(keymap):
             return []
         
-        layer = keymap[current_layer]
-        matching_keys = []
-        
-        # Iterate through all keys in the layer
-        for row_idx, row in enumerate(layer):
+        return list(self._classify_layer(keymap, current_layer).get(category, ()))
+
+    def _classify_layer(self, keymap, layer_idx):
+        """Return {category: [key indices]} for a layer, walking its keys once.
+
+        The result is cached per layer until the dialog is shown again, so
+        pressing several category buttons only classifies the layer once.
+        """
+        categories = self._layer_category_cache.get(layer_idx)
+        if categories is not None:
+            return categories
+        categories = {category: [] for category in KEY_CATEGORY_MATCHERS}
+        for row_idx, row in enumerate(keymap[layer_idx]):
             for col_idx, key_code in enumerate(row):
-                key_index = row_idx * 4 + col_idx  # 5x4 grid
-                
-                if self.key_matches_category(key_code, category):
-                    matching_keys.append(key_index)
-        
-        return matching_keys
+                if not key_code or key_code == "KC.NO" or key_code == "KC.TRNS":
+                    continue
+                key = key_code.upper()
+                for category, matcher in KEY_CATEGORY_MATCHERS.items():
+                    if matcher(key):
+                        categories[category].append(row_idx * 4 + col_idx)  # 5x4 grid
+        self._layer_category_cache[layer_idx] = categories
+        return categories
     
     def key_matches_category(self, key_code, category):
         """Check if a keycode belongs to a specific category.
@@ -2581,34 +2969,8 @@ class PerKeyColorDialog(QDialog):
         """
         if not key_code or key_code == "KC.NO" or key_code == "KC.TRNS":
             return False
-        
-        key = key_code.upper()
-        
-        if category == "macro":
-            return key.startswith("MACRO(")
-        elif category == "basic":
-            # Letters and numbers
-            return any(key.endswith(f".{c}") for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
-        elif category == "modifiers":
-            return any(mod in key for mod in ["LSHIFT", "RSHIFT", "LCTRL", "RCTRL", "LALT", "RALT", "LGUI", "RGUI"])
-        elif category == "navigation":
-            return any(nav in key for nav in ["HOME", "END", "PGUP", "PGDN", "INS", "DEL"])
-        elif category == "function":
-            return any(f"F{i}" in key for i in range(1, 25))
-        elif category == "media":
-            return any(med in key for med in ["MUTE", "VOLU", "VOLD", "MPLY", "MSTP", "MNXT", "MPRV"])
-        elif category == "mouse":
-            return "MS_" in key or "MW_" in key or "MB_" in key
-        elif category == "layers":
-            return any(lyr in key for lyr in ["MO(", "TO(", "TG(", "DF(", "LT("])
-        elif category == "wasd":
-            return any(key.endswith(f".{c}") for c in ["W", "A", "S", "D"])
-        elif category == "arrows":
-            # Only match arrow keys, not page up/down or home/end
-            # Note: RIGHT is abbreviated as RGHT in KMK
-            return any(key.endswith(f".{arr}") for arr in ["UP", "DOWN", "LEFT", "RGHT"])
-        
-        return False
+        matcher = KEY_CATEGORY_MATCHERS.get(category)
+        return matcher is not None and matcher(key_code.upper())
 
     def pick_granular_color(self, granular_type):
         current = self.granular_colors.get(granular_type, self.fill_color)
@@ -2627,58 +2989,15 @@ class PerKeyColorDialog(QDialog):
             return
         color = self.granular_colors.get(granular_type, self.fill_color)
 
-        number_keys = ['KC.N1', 'KC.N2', 'KC.N3', 'KC.N4', 'KC.N5', 'KC.N6', 'KC.N7', 'KC.N8', 'KC.N9', 'KC.N0']
-        letter_keys = [
-            'KC.A', 'KC.B', 'KC.C', 'KC.D', 'KC.E', 'KC.F', 'KC.G', 'KC.H', 'KC.I', 'KC.J',
-            'KC.K', 'KC.L', 'KC.M', 'KC.N', 'KC.O', 'KC.P', 'KC.Q', 'KC.R', 'KC.S', 'KC.T',
-            'KC.U', 'KC.V', 'KC.W', 'KC.X', 'KC.Y', 'KC.Z'
-        ]
-        space_keys = ['KC.SPC', 'KC.SPACE']
-        enter_keys = ['KC.ENT', 'KC.ENTER', 'KC.KP_ENTER']
-        backspace_keys = ['KC.BSPC', 'KC.DEL', 'KC.BACKSPACE', 'KC.DELETE']
-        tab_keys = ['KC.TAB']
-        shift_keys = ['KC.LSFT', 'KC.RSFT', 'KC.LSHIFT', 'KC.RSHIFT']
-        ctrl_keys = ['KC.LCTL', 'KC.RCTL', 'KC.LCTRL', 'KC.RCTRL']
-        alt_keys = ['KC.LALT', 'KC.RALT']
-        keypad_number_keys = ['KC.KP_0', 'KC.KP_1', 'KC.KP_2', 'KC.KP_3', 'KC.KP_4', 'KC.KP_5', 'KC.KP_6', 'KC.KP_7', 'KC.KP_8', 'KC.KP_9']
-        keypad_nav_keys = ['KC.KP_DOT', 'KC.KP_0', 'KC.KP_1', 'KC.KP_2', 'KC.KP_3', 'KC.KP_4', 'KC.KP_5', 'KC.KP_6', 'KC.KP_7', 'KC.KP_8', 'KC.KP_9']
-        keypad_op_keys = ['KC.KP_SLASH', 'KC.KP_ASTERISK', 'KC.KP_MINUS', 'KC.KP_PLUS', 'KC.KP_ENTER', 'KC.KP_DOT', 'KC.KP_EQUAL', 'KC.KP_COMMA', 'KC.NUMLOCK']
-
-        idx = 0
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if r < len(layer_data) and c < len(layer_data[r]):
-                    key = layer_data[r][c]
-                    should_color = False
-
-                    if granular_type == 'numbers' and key in number_keys:
-                        should_color = True
-                    elif granular_type == 'letters' and key in letter_keys:
-                        should_color = True
-                    elif granular_type == 'space' and key in space_keys:
-                        should_color = True
-                    elif granular_type == 'enter' and key in enter_keys:
-                        should_color = True
-                    elif granular_type == 'backspace' and key in backspace_keys:
-                        should_color = True
-                    elif granular_type == 'tab' and key in tab_keys:
-                        should_color = True
-                    elif granular_type == 'shift' and key in shift_keys:
-                        should_color = True
-                    elif granular_type == 'ctrl' and key in ctrl_keys:
-                        should_color = True
-                    elif granular_type == 'alt' and key in alt_keys:
-                        should_color = True
-                    elif granular_type == 'keypad_nums' and key in keypad_number_keys:
-                        should_color = True
-                    elif granular_type == 'keypad_nav' and key in keypad_nav_keys:
-                        should_color = True
-                    elif granular_type == 'keypad_ops' and key in keypad_op_keys:
-                        should_color = True
-
-                    if should_color:
-                        self.key_colors[str(idx)] = color
-                idx += 1
+        keys = GRANULAR_KEY_SETS.get(granular_type, ())
+        key_colors = self.key_colors
+        cols = self.cols
+        # Cells outside the keymap simply have no row/key to match
+        for r, row in enumerate(layer_data[:self.rows]):
+            base = r * cols
+            for c, key in enumerate(row[:cols]):
+                if key in keys:
+                    key_colors[base + c] = color
 
         self.refresh_key_buttons()
 
@@ -2731,8 +3050,12 @@ class PerKeyColorDialog(QDialog):
             )
         return False
 
+    @staticmethod
+    def _str_keyed(colors):
+        return {str(k): v for k, v in colors.items()}
+
     def get_maps(self):
-        return self.key_colors.copy(), self.underglow_colors.copy()
+        return self._str_keyed(self.key_colors), self._str_keyed(self.underglow_colors)
 
     def accept(self):
         if self.parent_ref and hasattr(self.parent_ref, 'rgb_matrix_config'):
@@ -2740,14 +3063,14 @@ class PerKeyColorDialog(QDialog):
             layer_colors = config.setdefault('layer_key_colors', {})
             layer_key = str(self.layer_index)
             if self.key_colors:
-                layer_colors[layer_key] = self.key_colors.copy()
+                layer_colors[layer_key] = self._str_keyed(self.key_colors)
             elif layer_key in layer_colors:
                 layer_colors.pop(layer_key)
 
             if self.layer_index == 0:
-                config['key_colors'] = self.key_colors.copy()
+                config['key_colors'] = self._str_keyed(self.key_colors)
 
-            config['underglow_colors'] = self.underglow_colors.copy()
+            config['underglow_colors'] = self._str_keyed(self.underglow_colors)
             self.parent_ref.update_macropad_display()
         super().accept()
 
@@ -2885,12 +3208,12 @@ class TapDanceDialog(QDialog):
         layout.addWidget(QLabel("<b>Actions (in order of tap count):</b>"))
         actions_list = QListWidget()
         actions_list.setMaximumHeight(200)
+        actions_list.setUniformItemSizes(True)
         layout.addWidget(actions_list)
         
-        # Load existing actions if editing
+        # Load existing actions if editing (one batched insert)
         if edit_index is not None:
-            for action in existing['actions']:
-                actions_list.addItem(action)
+            actions_list.addItems(existing['actions'])
         
         # Action type selector
         action_type_group = QGroupBox("Add Action")
@@ -3755,7 +4078,6 @@ class ToastNotification(QWidget):
     
     def start_timer(self):
         """Start countdown to auto-dismiss."""
-        from PyQt6.QtCore import QTimer
         QTimer.singleShot(self.duration, self.hide_animated)
     
     def hide_animated(self):
@@ -3792,6 +4114,37 @@ class ToastNotification(QWidget):
         return toast
 
 
+@lru_cache(maxsize=8)
+def macropad_grid_order(rows: int, cols: int) -> tuple[tuple[int, int, int, int], ...]:
+    """
+    Return (row, col, display_row, display_col) for every key of a rows x cols grid.
+
+    The on-screen grid is rotated 180° to match the physical board, so keymap
+    (row, col) is shown at (rows - 1 - row, cols - 1 - col). Entries run from
+    the last key back to the first, the order the grid buttons are built in.
+    """
+    return tuple(
+        (r, c, rows - 1 - r, cols - 1 - c)
+        for r in range(rows - 1, -1, -1)
+        for c in range(cols - 1, -1, -1)
+    )
+
+
+class KeyButton(QPushButton):
+    """
+    Keymap grid button that reports double-clicks as a signal.
+
+    Overriding mouseDoubleClickEvent keeps every other mouse, hover and paint
+    event inside Qt, where a per-button event filter would route all of them
+    through Python just to spot the odd double-click.
+    """
+    doubleClicked = pyqtSignal()
+
+    def mouseDoubleClickEvent(self, event):
+        self.doubleClicked.emit()
+        event.accept()
+
+
 # --- Main Application Window ---
 class KMKConfigurator(QMainWindow):
     """The main application window for configuring KMK-based macropads."""
@@ -3840,6 +4193,10 @@ class KMKConfigurator(QMainWindow):
                 base_hint.setHeight(28)
             return base_hint
 
+    # Full window stylesheet per theme name; the QSS only depends on the theme
+    _STYLESHEET_CACHE = {}
+    _applied_qss = None
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("KMK Macropad Configurator - Chronos Pad v1.0.0-beta")
@@ -3862,9 +4219,20 @@ class KMKConfigurator(QMainWindow):
 
         # --- Application State ---
         self.selected_key_coords = None
-        self.macropad_buttons = {}
+        self.macropad_buttons = []  # macropad_buttons[row][col] -> grid KeyButton
+        self._macropad_cell_cache = {}  # (row, col) -> (text, stylesheet) last applied
+        self._layer_button_texts = {}  # layer index -> (keys snapshot, grid button texts)
+        self._saved_extension_files = None  # file name -> content last read/written (see save_extension_configs)
+        self._key_capture_dialog = None  # created on the first grid double-click, then reused
+        # Coalesces per-keystroke/per-step extension edits into one save
+        self._extension_save_timer = QTimer(self)
+        self._extension_save_timer.setSingleShot(True)
+        self._extension_save_timer.setInterval(500)
+        self._extension_save_timer.timeout.connect(self._save_extension_configs_quietly)
         self.current_layer = 0
         self.layer_clipboard = None  # For copy/paste layer operations
+        self._board_drive_cache = {}  # drive name -> last mount path found
+        self._display_code_cache = None  # (inputs key, generated display code)
         self.key_clipboard = None  # For copy/paste individual key operations
         
         # Fixed hardware configuration
@@ -3875,6 +4243,7 @@ class KMKConfigurator(QMainWindow):
         self.diode_orientation = FIXED_DIODE_ORIENTATION
         
         self.macros = {}
+        self._sorted_macro_names = []  # sorted(self.macros), refreshed by update_macro_list
         self.profiles = {}
         # Extensions are always enabled - user can configure them
         self.enable_encoder = True
@@ -3956,11 +4325,6 @@ class KMKConfigurator(QMainWindow):
 
         # Show startup dialog asking to load previous state
         self.show_startup_dialog()
-        # Install hover/animation effects across all buttons in the UI
-        try:
-            self.install_global_hover_effects()
-        except Exception:
-            pass
     
     def center_on_screen(self):
         """Center the window on the screen."""
@@ -4249,9 +4613,9 @@ class KMKConfigurator(QMainWindow):
         # apply theme (cheerful geometry already baked into base)
         self.apply_theme(self.current_theme)
 
-    def _apply_cheerful_stylesheet(self):
+    def _cheerful_theme_qss(self):
         """
-        Apply modern cheerful theme (vibrant dark variant).
+        Build the stylesheet for the modern cheerful theme (vibrant dark variant).
         
         Features:
         - Warmer, more vibrant colors than standard dark theme
@@ -4290,6 +4654,11 @@ class KMKConfigurator(QMainWindow):
                 border: 1px solid #4a5568;
             }
             
+            /* Keymap buttons - lit keys override this with their LED color */
+            QPushButton#keymapButton {
+                font-size: 9pt;
+            }
+
             /* Selected keymap button */
             QPushButton#keymapButton:checked { 
                 background-color: #2a5a8a; 
@@ -4509,11 +4878,11 @@ class KMKConfigurator(QMainWindow):
                 background: #6b7888;
             }
         '''
-        self.setStyleSheet(base + cards + color_qss)
+        return base + cards + color_qss
 
-    def _apply_light_stylesheet(self):
+    def _light_theme_qss(self):
         """
-        Apply modern light theme with Material Design principles.
+        Build the stylesheet for the modern light theme with Material Design principles.
         
         Features:
         - Clean, bright surfaces with subtle shadows
@@ -4553,6 +4922,11 @@ class KMKConfigurator(QMainWindow):
                 border: 1px solid #e5e7eb;
             }
             
+            /* Keymap buttons - lit keys override this with their LED color */
+            QPushButton#keymapButton {
+                font-size: 9pt;
+            }
+
             /* Selected keymap button */
             QPushButton#keymapButton:checked { 
                 background-color: #5a9adf; 
@@ -4772,11 +5146,11 @@ class KMKConfigurator(QMainWindow):
                 background: #9ca3af;
             }
         '''
-        self.setStyleSheet(base + cards + color_qss)
+        return base + cards + color_qss
 
-    def _apply_dark_stylesheet(self):
+    def _dark_theme_qss(self):
         """
-        Apply modern dark theme with Material Design principles.
+        Build the stylesheet for the modern dark theme with Material Design principles.
         
         Features:
         - Elevated surfaces with subtle shadows
@@ -4816,6 +5190,11 @@ class KMKConfigurator(QMainWindow):
                 border: 1px solid #374151;
             }
             
+            /* Keymap buttons - lit keys override this with their LED color */
+            QPushButton#keymapButton {
+                font-size: 9pt;
+            }
+
             /* Selected keymap button with glow effect */
             QPushButton#keymapButton:checked { 
                 background-color: #2a5a8a; 
@@ -5070,7 +5449,7 @@ class KMKConfigurator(QMainWindow):
                 background: #6b7280;
             }
         '''
-        self.setStyleSheet(base + cards + color_qss)
+        return base + cards + color_qss
 
     def _get_modern_card_stylesheet(self):
         """
@@ -5084,7 +5463,7 @@ class KMKConfigurator(QMainWindow):
             str: QSS stylesheet string for card components
             
         Note:
-            Theme-specific colors are applied in theme methods (_apply_dark_stylesheet, etc.)
+            Theme-specific colors are added in theme methods (_dark_theme_qss, etc.)
         """
         return '''
             /* Modern Card-Based Layout */
@@ -5223,9 +5602,19 @@ class KMKConfigurator(QMainWindow):
         return styles.get(variant, styles['neutral'])
 
     # --- Extension config persistence ---
-    def save_extension_configs(self):
+    def save_extension_configs(self, show_errors=True):
+        """Write the extension files in CONFIG_SAVE_DIR.
+
+        The file contents are built first and compared with what was last
+        loaded or written; only files whose content changed, or that are no
+        longer on disk, are rewritten, each through a temp file that is
+        swapped in so a failed write never truncates one.
+
+        Args:
+            show_errors: Report a failed save in a message box; when False
+                (deferred saves) it is only printed as a warning
+        """
         try:
-            os.makedirs(CONFIG_SAVE_DIR, exist_ok=True)
             meta = {
                 "enable_encoder": self.enable_encoder,
                 "enable_analogin": self.enable_analogin,
@@ -5234,36 +5623,48 @@ class KMKConfigurator(QMainWindow):
                 "encoder_divisor": self.encoder_divisor,
                 "custom_ext_code": self.custom_ext_code,
             }
-            with open(os.path.join(CONFIG_SAVE_DIR, 'extensions.json'), 'w') as f:
-                json.dump(meta, f, indent=2)
-
-            with open(os.path.join(CONFIG_SAVE_DIR, 'encoder.py'), 'w') as f:
-                encoder_content = self.encoder_config_str or ''
-                if (
-                    self.encoder_divisor
-                    and 'encoder_handler = EncoderHandler()' in encoder_content
-                    and 'encoder_handler.divisor' not in encoder_content
-                ):
-                    replacement = (
-                        "encoder_handler = EncoderHandler()\n"
-                        f"encoder_handler.divisor = {int(self.encoder_divisor)}"
-                    )
-                    encoder_content = encoder_content.replace(
-                        'encoder_handler = EncoderHandler()', replacement, 1
-                    )
-                f.write(encoder_content)
-            with open(os.path.join(CONFIG_SAVE_DIR, 'analogin.py'), 'w') as f:
-                f.write(self.analogin_config_str or '')
-            with open(os.path.join(CONFIG_SAVE_DIR, 'display.py'), 'w') as f:
-                f.write(self.display_config_str or '')
-            
-            # Save boot.py configuration - use the stored boot_config_str directly
-            with open(os.path.join(CONFIG_SAVE_DIR, 'boot.py'), 'w') as f:
-                f.write(self.boot_config_str or '')
 
-            rgb_config = self._export_rgb_config()
-            with open(os.path.join(CONFIG_SAVE_DIR, 'rgb_matrix.json'), 'w') as f:
-                json.dump(rgb_config, f, indent=2)
+            encoder_content = self.encoder_config_str or ''
+            if (
+                self.encoder_divisor
+                and 'encoder_handler = EncoderHandler()' in encoder_content
+                and 'encoder_handler.divisor' not in encoder_content
+            ):
+                replacement = (
+                    "encoder_handler = EncoderHandler()\n"
+                    f"encoder_handler.divisor = {int(self.encoder_divisor)}"
+                )
+                encoder_content = encoder_content.replace(
+                    'encoder_handler = EncoderHandler()', replacement, 1
+                )
+
+            files = {
+                'extensions.json': json.dumps(meta, indent=2),
+                'encoder.py': encoder_content,
+                'analogin.py': self.analogin_config_str or '',
+                'display.py': self.display_config_str or '',
+                # Save boot.py configuration - use the stored boot_config_str directly
+                'boot.py': self.boot_config_str or '',
+                'rgb_matrix.json': json.dumps(self._export_rgb_config(), indent=2),
+            }
+            saved = self._saved_extension_files or {}
+
+            os.makedirs(CONFIG_SAVE_DIR, exist_ok=True)
+            for file_name, content in files.items():
+                file_path = os.path.join(CONFIG_SAVE_DIR, file_name)
+                if saved.get(file_name) == content and os.path.exists(file_path):
+                    continue
+                tmp_path = file_path + ".tmp"
+                try:
+                    # Explicit UTF-8 so load_extension_configs decodes what is
+                    # written here regardless of the locale encoding
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        f.write(content)
+                    os.replace(tmp_path, file_path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+            self._saved_extension_files = files
 
             for legacy_name in ('peg_rgb.py', 'peg_rgb_colors.json', 'peg_rgb_layer.py'):
                 legacy_path = os.path.join(CONFIG_SAVE_DIR, legacy_name)
@@ -5273,13 +5674,29 @@ class KMKConfigurator(QMainWindow):
                     except OSError:
                         pass
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Could not save extension configs:\n{e}")
+            if show_errors:
+                QMessageBox.critical(self, "Error", f"Could not save extension configs:\n{e}")
+            else:
+                print(f"Warning: Could not save extension configs: {e}")
+
+    def schedule_extension_save(self):
+        """Save the extension files once edits pause (see _extension_save_timer)."""
+        self._extension_save_timer.start()
+
+    def _save_extension_configs_quietly(self):
+        """save_extension_configs for timer-driven saves: a failure is only
+        logged, since a modal error popping up long after the edit that caused
+        it would make no sense to the user."""
+        self.save_extension_configs(show_errors=False)
 
     def load_extension_configs(self):
         try:
+            # File contents as read, so the next save skips files it would
+            # write back unchanged
+            loaded = self._saved_extension_files = {}
             if os.path.exists(os.path.join(CONFIG_SAVE_DIR, 'extensions.json')):
-                with open(os.path.join(CONFIG_SAVE_DIR, 'extensions.json'), 'r') as f:
-                    meta = json.load(f)
+                loaded['extensions.json'] = Path(CONFIG_SAVE_DIR, 'extensions.json').read_text(encoding='utf-8')
+                meta = json.loads(loaded['extensions.json'])
                 # Load enable/disable states from saved config
                 self.enable_encoder = meta.get('enable_encoder', True)
                 self.enable_analogin = meta.get('enable_analogin', True)
@@ -5290,24 +5707,20 @@ class KMKConfigurator(QMainWindow):
             # Load snippet files if present
             enc_path = os.path.join(CONFIG_SAVE_DIR, 'encoder.py')
             if os.path.exists(enc_path):
-                with open(enc_path, 'r') as f:
-                    self.encoder_config_str = f.read()
+                self.encoder_config_str = loaded['encoder.py'] = Path(enc_path).read_text(encoding='utf-8')
             an_path = os.path.join(CONFIG_SAVE_DIR, 'analogin.py')
             if os.path.exists(an_path):
-                with open(an_path, 'r') as f:
-                    self.analogin_config_str = f.read()
+                self.analogin_config_str = loaded['analogin.py'] = Path(an_path).read_text(encoding='utf-8')
             disp_path = os.path.join(CONFIG_SAVE_DIR, 'display.py')
             if os.path.exists(disp_path):
-                with open(disp_path, 'r') as f:
-                    self.display_config_str = f.read()
+                self.display_config_str = loaded['display.py'] = Path(disp_path).read_text(encoding='utf-8')
             boot_path = os.path.join(CONFIG_SAVE_DIR, 'boot.py')
             if os.path.exists(boot_path):
-                with open(boot_path, 'r') as f:
-                    self.boot_config_str = f.read()
+                self.boot_config_str = loaded['boot.py'] = Path(boot_path).read_text(encoding='utf-8')
             rgb_path = os.path.join(CONFIG_SAVE_DIR, 'rgb_matrix.json')
             if os.path.exists(rgb_path):
-                with open(rgb_path, 'r') as f:
-                    data = json.load(f)
+                loaded['rgb_matrix.json'] = Path(rgb_path).read_text(encoding='utf-8')
+                data = json.loads(loaded['rgb_matrix.json'])
                 merged = build_default_rgb_matrix_config()
                 merged.update(data)
                 merged['key_colors'] = dict(data.get('key_colors', {}))
@@ -5337,8 +5750,7 @@ class KMKConfigurator(QMainWindow):
                 legacy_colors = {}
                 if os.path.exists(colors_path):
                     try:
-                        with open(colors_path, 'r') as f:
-                            legacy_colors = json.load(f)
+                        legacy_colors = json.loads(Path(colors_path).read_bytes())
                     except Exception:
                         legacy_colors = {}
                 config = build_default_rgb_matrix_config()
@@ -5364,21 +5776,29 @@ class KMKConfigurator(QMainWindow):
             settings = {
                 "theme": getattr(self, 'current_theme', 'Dark')
             }
-            with open(os.path.join(CONFIG_SAVE_DIR, 'ui_settings.json'), 'w') as f:
-                json.dump(settings, f, indent=2)
+            self._write_if_changed('ui_settings.json', json.dumps(settings, indent=2))
         except Exception:
             pass
 
+    def _write_if_changed(self, file_name, text):
+        """Write *text* to CONFIG_SAVE_DIR/file_name unless it matches what is already there."""
+        path = Path(CONFIG_SAVE_DIR, file_name)
+        try:
+            if path.read_text(encoding='utf-8') == text:
+                return
+        except (OSError, UnicodeDecodeError):
+            pass  # missing or unreadable, so write it
+        path.write_text(text, encoding='utf-8')
+
     def load_ui_settings(self):
         """Load UI settings (theme and session state) from kmk_Config_Save/ui_settings.json."""
         try:
             settings_path = os.path.join(CONFIG_SAVE_DIR, 'ui_settings.json')
             if os.path.exists(settings_path):
-                with open(settings_path, 'r') as f:
-                    settings = json.load(f)
-                    theme = settings.get('theme', 'Dark')
-                    if theme in ['Cheerful', 'Light', 'Dark']:
-                        self.current_theme = theme
+                settings = json.loads(Path(settings_path).read_bytes())
+                theme = settings.get('theme', 'Dark')
+                if theme in ['Cheerful', 'Light', 'Dark']:
+                    self.current_theme = theme
         except Exception:
             pass
 
@@ -5400,9 +5820,7 @@ class KMKConfigurator(QMainWindow):
                 'keycode_search_query': getattr(self.keycode_search_box, 'text', lambda: '')() if hasattr(self, 'keycode_search_box') else '',
                 'splitter_sizes': splitter_sizes,
             }
-            session_path = os.path.join(CONFIG_SAVE_DIR, 'session.json')
-            with open(session_path, 'w') as f:
-                json.dump(session_data, f, indent=4)
+            self._write_if_changed('session.json', json.dumps(session_data, separators=(',', ':')))
         except Exception:
             pass
 
@@ -5411,16 +5829,16 @@ class KMKConfigurator(QMainWindow):
         try:
             session_path = os.path.join(CONFIG_SAVE_DIR, 'session.json')
             if os.path.exists(session_path):
-                with open(session_path, 'r') as f:
-                    session_data = json.load(f)
+                session_data = json.loads(Path(session_path).read_bytes())
                 
                 # Restore current layer
                 layer = session_data.get('current_layer', 0)
                 if 0 <= layer < len(self.keymap_data):
-                    self.current_layer = layer
-                    # Update layer tabs UI
+                    # Update layer tabs UI; on_layer_changed switches
+                    # current_layer and redraws the grid for it
                     if hasattr(self, 'layer_tabs'):
                         self.layer_tabs.setCurrentIndex(layer)
+                    self.current_layer = layer
                 
                 # Restore selected key
                 coords = session_data.get('selected_key_coords')
@@ -5716,25 +6134,7 @@ class KMKConfigurator(QMainWindow):
         rgb_btn_layout.addWidget(rgb_cfg_btn)
         
         rgb_colors_btn = QPushButton("🎨 Per-Key Colors")
-        def open_per_key_colors():
-            cfg = self.rgb_matrix_config
-            layer_idx = self.current_layer if 0 <= self.current_layer < len(self.keymap_data) else 0
-            layer_overrides = cfg.get('layer_key_colors', {}) or {}
-            key_map = layer_overrides.get(str(layer_idx), cfg.get('key_colors', {}))
-            pc = PerKeyColorDialog(
-                self,
-                rows=self.rows,
-                cols=self.cols,
-                key_colors=key_map,
-                underglow_count=cfg.get('num_underglow', 0),
-                underglow_colors=cfg.get('underglow_colors', {}),
-                default_key_color=cfg.get('default_key_color', '#FFFFFF'),
-                default_underglow_color=cfg.get('default_underglow_color', '#000000'),
-                layer_index=layer_idx,
-            )
-            if pc.exec():
-                self.save_extension_configs()
-        rgb_colors_btn.clicked.connect(open_per_key_colors)
+        rgb_colors_btn.clicked.connect(self.open_per_key_colors)
         rgb_colors_btn.setToolTip("Customize individual key colors for current layer")
         rgb_btn_layout.addWidget(rgb_colors_btn)
         rgb_btn_layout.addStretch()
@@ -5946,40 +6346,54 @@ class KMKConfigurator(QMainWindow):
         self.apply_theme(name)
         self.save_ui_settings()
 
+    def _theme_stylesheet(self, name):
+        """Return the full stylesheet for theme *name*, building it once per theme."""
+        qss = self._STYLESHEET_CACHE.get(name)
+        if qss is None:
+            builder = {
+                'cheerful': self._cheerful_theme_qss,
+                'light': self._light_theme_qss,
+                'dark': self._dark_theme_qss,
+            }.get(name)
+            if builder is None:
+                return None
+            qss = self._STYLESHEET_CACHE[name] = builder()
+        return qss
+
     def apply_theme(self, name):
         # Lightweight theme application: adjust stylesheet variables
         name = (name or "Cheerful").lower()
-        if name == 'cheerful':
-            self._apply_cheerful_stylesheet()
-        elif name == 'light':
-            self._apply_light_stylesheet()
-        elif name == 'dark':
-            self._apply_dark_stylesheet()
+        qss = self._theme_stylesheet(name)
+        # Re-applying an identical stylesheet would still re-polish every widget;
+        # cached sheets are shared objects, so an identity check is enough.
+        if qss is not None and qss is not self._applied_qss:
+            self.setStyleSheet(qss)
+            self._applied_qss = qss
 
     # --- Extension toggle handlers ---
     def on_encoder_toggled(self, checked):
         """Handle encoder checkbox toggle."""
         self.enable_encoder = checked
         self.update_extension_button_states()
-        self.save_extension_configs()
+        self.schedule_extension_save()
 
     def on_analogin_toggled(self, checked):
         """Handle analog input checkbox toggle."""
         self.enable_analogin = checked
         self.update_extension_button_states()
-        self.save_extension_configs()
+        self.schedule_extension_save()
 
     def on_display_toggled(self, checked):
         """Handle display checkbox toggle."""
         self.enable_display = checked
         self.update_extension_button_states()
-        self.save_extension_configs()
+        self.schedule_extension_save()
 
     def on_rgb_toggled(self, checked):
         """Handle RGB checkbox toggle."""
         self.enable_rgb = checked
         self.update_extension_button_states()
-        self.save_extension_configs()
+        self.schedule_extension_save()
 
     def update_extension_button_states(self):
         """Enable or disable configuration buttons based on checkbox states."""
@@ -6032,11 +6446,9 @@ class KMKConfigurator(QMainWindow):
         else:
             self.boot_config_str = ""
 
-        try:
-            self.save_extension_configs()
-        except Exception:
-            # Avoid blocking UI if disk write fails
-            pass
+        # Fires per keystroke in the boot editors; the deferred save is quiet
+        # so a failing disk write never blocks the UI
+        self.schedule_extension_save()
 
     def on_rename_drive_toggled(self, checked: bool) -> None:
         """Enable or disable the drive name input and refresh config."""
@@ -6108,12 +6520,12 @@ class KMKConfigurator(QMainWindow):
     def on_encoder_divisor_changed(self, value):
         """Handle encoder divisor spinbox change."""
         self.encoder_divisor = value
-        self.save_extension_configs()
+        self.schedule_extension_save()
     
     def on_custom_code_changed(self):
         """Handle custom extension code changes."""
         self.custom_ext_code = self.custom_extension_code.toPlainText()
-        self.save_extension_configs()
+        self.schedule_extension_save()
         # Update TapDance list when code changes
         self.update_tapdance_list()
     
@@ -6244,8 +6656,6 @@ class KMKConfigurator(QMainWindow):
 
     def configure_display(self):
         """Configure display settings - shows auto-generated keymap layout."""
-        from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QTextEdit, QDialogButtonBox
-        
         dlg = QDialog(self)
         dlg.setWindowTitle("Display Configuration")
         dlg.resize(700, 500)
@@ -6276,31 +6686,11 @@ class KMKConfigurator(QMainWindow):
         dlg = PegRgbConfigDialog(self, self.rgb_matrix_config)
 
         dlg_colors_btn = QPushButton("Configure per-key colors")
-
-        def open_colors():
-            cfg = self.rgb_matrix_config
-            layer_idx = self.current_layer if 0 <= self.current_layer < len(self.keymap_data) else 0
-            layer_overrides = cfg.get('layer_key_colors', {}) or {}
-            key_map = layer_overrides.get(str(layer_idx), cfg.get('key_colors', {}))
-            pc = PerKeyColorDialog(
-                self,
-                rows=self.rows,
-                cols=self.cols,
-                key_colors=key_map,
-                underglow_count=cfg.get('num_underglow', 0),
-                underglow_colors=cfg.get('underglow_colors', {}),
-                default_key_color=cfg.get('default_key_color', '#FFFFFF'),
-                default_underglow_color=cfg.get('default_underglow_color', '#000000'),
-                layer_index=layer_idx,
-            )
-            if pc.exec():
-                self.save_extension_configs()
-
         try:
             dlg.layout().insertWidget(0, dlg_colors_btn)
-            dlg_colors_btn.clicked.connect(open_colors)
+            dlg_colors_btn.clicked.connect(self.open_per_key_colors)
         except Exception:
-            dlg_colors_btn.clicked.connect(open_colors)
+            dlg_colors_btn.clicked.connect(self.open_per_key_colors)
 
         if dlg.exec():
             self.rgb_matrix_config = dlg.get_config()
@@ -6308,6 +6698,26 @@ class KMKConfigurator(QMainWindow):
 
         self.update_macropad_display()
     
+    def open_per_key_colors(self):
+        """Open the per-key color dialog for the current layer."""
+        cfg = self.rgb_matrix_config
+        layer_idx = self.current_layer if 0 <= self.current_layer < len(self.keymap_data) else 0
+        layer_overrides = cfg.get('layer_key_colors', {}) or {}
+        key_map = layer_overrides.get(str(layer_idx), cfg.get('key_colors', {}))
+        pc = PerKeyColorDialog(
+            self,
+            rows=self.rows,
+            cols=self.cols,
+            key_colors=key_map,
+            underglow_count=cfg.get('num_underglow', 0),
+            underglow_colors=cfg.get('underglow_colors', {}),
+            default_key_color=cfg.get('default_key_color', '#FFFFFF'),
+            default_underglow_color=cfg.get('default_underglow_color', '#000000'),
+            layer_index=layer_idx,
+        )
+        if pc.exec():
+            self.save_extension_configs()
+
     def add_tapdance_helper(self):
         """Open TapDance helper dialog"""
         dialog = TapDanceDialog(self)
@@ -6328,12 +6738,9 @@ class KMKConfigurator(QMainWindow):
         custom_code = self.custom_extension_code.toPlainText() if hasattr(self, 'custom_extension_code') else ""
         
         # Find lines like: TD_NAME = KC.TD(...)
-        import re
-        td_pattern = r'^([A-Z_][A-Z0-9_]*)\s*=\s*KC\.TD\s*\('
-        
         td_names = []
         for line in custom_code.split('\n'):
-            match = re.match(td_pattern, line.strip())
+            match = TAPDANCE_DEF_PATTERN.match(line.strip())
             if match:
                 td_names.append(match.group(1))
         
@@ -6371,22 +6778,22 @@ class KMKConfigurator(QMainWindow):
         """Populate config selector with saved JSON configs from kmk_Config_Save and project root."""
 
         def _collect(folder: str) -> list[str]:
-            results: list[str] = []
-            if not os.path.isdir(folder):
-                return results
-            for name in os.listdir(folder):
-                lower = name.lower()
-                if lower.startswith('config') and lower.endswith('.json'):
-                    full_path = os.path.join(folder, name)
-                    if os.path.isfile(full_path):
-                        results.append(full_path)
-            return results
+            # scandir entries carry their file type, so no extra stat per name
+            try:
+                with os.scandir(folder) as entries:
+                    return [
+                        entry.path
+                        for entry in entries
+                        if CONFIG_FILE_NAME_RE.match(entry.name)
+                        and entry.is_file()
+                    ]
+            except OSError:
+                return []
 
         paths = _collect(CONFIG_SAVE_DIR)
         # Include project-root configs if present (maintains backward compatibility)
-        for path in _collect(BASE_DIR):
-            if path not in paths:
-                paths.append(path)
+        seen = set(paths)
+        paths.extend(path for path in _collect(BASE_DIR) if path not in seen)
 
         paths.sort(key=lambda p: (os.path.dirname(p).lower(), os.path.basename(p).lower()))
 
@@ -6573,7 +6980,7 @@ class KMKConfigurator(QMainWindow):
         if self.selected_key_coords:
             row, col = self.selected_key_coords
             self.keymap_data[self.current_layer][row][col] = "KC.NO"
-            self.update_macropad_display()
+            self.update_macropad_cells([(row, col)])
         else:
             QMessageBox.information(self, "No Key Selected", "Please select a key on the grid first.")
     
@@ -6582,7 +6989,7 @@ class KMKConfigurator(QMainWindow):
         if self.selected_key_coords:
             row, col = self.selected_key_coords
             self.keymap_data[self.current_layer][row][col] = "KC.TRNS"
-            self.update_macropad_display()
+            self.update_macropad_cells([(row, col)])
         else:
             QMessageBox.information(self, "No Key Selected", "Please select a key on the grid first.")
 
@@ -6724,7 +7131,7 @@ class KMKConfigurator(QMainWindow):
         delete_action.triggered.connect(lambda: self.set_key_value(row, col, "KC.NO"))
         
         # Show menu at button position
-        button = self.macropad_buttons.get((row, col))
+        button = self.get_macropad_button(row, col)
         if button:
             menu.exec(button.mapToGlobal(pos))
 
@@ -6748,7 +7155,7 @@ class KMKConfigurator(QMainWindow):
         if self.current_layer >= len(self.keymap_data):
             return
         self.keymap_data[self.current_layer][row][col] = self.key_clipboard
-        self.update_macropad_display()
+        self.update_macropad_cells([(row, col)])
         # Show toast notification
         ToastNotification.show_message(
             self, 
@@ -6762,7 +7169,7 @@ class KMKConfigurator(QMainWindow):
         if self.current_layer >= len(self.keymap_data):
             return
         self.keymap_data[self.current_layer][row][col] = value
-        self.update_macropad_display()
+        self.update_macropad_cells([(row, col)])
         # Show toast notification
         value_display = "No Key" if value == "KC.NO" else ("Transparent" if value == "KC.TRNS" else value)
         ToastNotification.show_message(
@@ -6791,6 +7198,9 @@ class KMKConfigurator(QMainWindow):
         self.macro_list_widget.setToolTip("Click a macro to assign it to the selected key")
         macros_layout.addWidget(self.macro_list_widget, 1)
         self.macro_list_widget.itemClicked.connect(self.on_macro_selected)
+        # Allow double-clicking a macro name to edit it (connected once here
+        # rather than on every update_macro_list refresh)
+        self.macro_list_widget.itemDoubleClicked.connect(lambda item: self.edit_macro_by_name(item.text()))
         
         # Macro management buttons
         macro_button_layout = QHBoxLayout()
@@ -6866,7 +7276,7 @@ class KMKConfigurator(QMainWindow):
             td_name = item.text()
             row, col = self.selected_key_coords
             self.keymap_data[self.current_layer][row][col] = td_name
-            self.update_macropad_display()
+            self.update_macropad_cells([(row, col)])
         else:
             QMessageBox.information(self, "No Key Selected", "Please select a key on the grid before assigning TapDance.")
     
@@ -6885,6 +7295,10 @@ class KMKConfigurator(QMainWindow):
 
     def closeEvent(self, event):
         """Save settings and session state on application exit."""
+        # Flush an extension save still waiting on the coalescing timer
+        if self._extension_save_timer.isActive():
+            self._extension_save_timer.stop()
+            self.save_extension_configs()
         self.save_macros()
         self.save_profiles()
         self.save_session_state()
@@ -6954,16 +7368,17 @@ class KMKConfigurator(QMainWindow):
     def save_macros(self):
         try:
             # MACRO_FILE is at BASE_DIR root, no subfolder needed
+            # Compact: indenting spreads every [action, value] pair over
+            # several lines and multiplies the file size
             with open(MACRO_FILE, 'w') as f:
-                json.dump(self.macros, f, indent=4)
+                json.dump(self.macros, f, separators=(',', ':'))
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Could not save macros:\n{e}")
 
     def load_macros(self):
         if os.path.exists(MACRO_FILE):
             try:
-                with open(MACRO_FILE, 'r') as f:
-                    self.macros = json.load(f)
+                self.macros = json.loads(Path(MACRO_FILE).read_bytes())
             except Exception as e:
                 # Show the user the parsing/loading error so they can fix the file
                 QMessageBox.critical(self, "Error", f"Could not parse macros file ({MACRO_FILE}):\n{e}")
@@ -7048,8 +7463,9 @@ class KMKConfigurator(QMainWindow):
 
     def save_profiles(self):
         try:
+            text = json.dumps(self.profiles, indent=4)
             with open(PROFILE_FILE, 'w') as f:
-                json.dump(self.profiles, f, indent=4)
+                f.write(text)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Could not save profiles:\n{e}")
 
@@ -7059,15 +7475,19 @@ class KMKConfigurator(QMainWindow):
         
         if os.path.exists(PROFILE_FILE):
             try:
-                with open(PROFILE_FILE, 'r') as f:
-                    self.profiles = json.load(f)
+                self.profiles = json.loads(Path(PROFILE_FILE).read_bytes())
             except Exception:
                 self.profiles = {}
         
-        self.profile_combo.blockSignals(True)
-        self.profile_combo.clear()
-        self.profile_combo.addItems(["Custom"] + sorted(self.profiles.keys()))
-        self.profile_combo.blockSignals(False)
+        items = ["Custom"] + sorted(self.profiles)
+        combo = self.profile_combo
+        # Leave the combo (and its current selection) alone when nothing changed
+        if [combo.itemText(i) for i in range(combo.count())] == items:
+            return
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItems(items)
+        combo.blockSignals(False)
 
     def save_current_profile(self):
         if not hasattr(self, 'profile_combo'):
@@ -7075,7 +7495,9 @@ class KMKConfigurator(QMainWindow):
         
         name, ok = QInputDialog.getText(self, "Save Profile", "Enter profile name:")
         if ok and name:
-            keymap_snapshot = json.loads(json.dumps(self.keymap_data))
+            # Keymap cells are immutable strings, so copying the row lists
+            # gives an independent snapshot without a JSON round trip
+            keymap_snapshot = [[list(row) for row in layer] for layer in self.keymap_data]
             profile_payload = {
                 "keymap_data": keymap_snapshot,
                 "extensions": {
@@ -7334,12 +7756,6 @@ class KMKConfigurator(QMainWindow):
         
         # Initialize state
         self.current_category = None
-        self._all_keycodes_flat = []
-        
-        # Build flat keycode list for search
-        for category, key_list in KEYCODES.items():
-            for keycode in key_list:
-                self._all_keycodes_flat.append((category, keycode))
         
         # Select first category by default
         if self.category_list:
@@ -7388,7 +7804,7 @@ class KMKConfigurator(QMainWindow):
         
         if category_name == "Macros":
             # Show macros
-            macro_keys = [f"MACRO({name})" for name in sorted(self.macros.keys())]
+            macro_keys = [f"MACRO({name})" for name in self._sorted_macro_names]
             self.keycode_list.addItems(macro_keys)
             
             # Add macro action buttons
@@ -7524,7 +7940,7 @@ class KMKConfigurator(QMainWindow):
         Args:
             filter_text: User-entered search text (case-insensitive)
         """
-        if not hasattr(self, "_all_keycodes_flat"):
+        if not hasattr(self, "keycode_list"):
             return
 
         search_value = (filter_text or "").strip().lower()
@@ -7542,11 +7958,7 @@ class KMKConfigurator(QMainWindow):
         found_any = False
         current_category_shown = None
 
-        for category, keycode in self._all_keycodes_flat:
-            # Get label for search matching
-            label = KEYCODE_LABELS.get(keycode, "")
-            search_text = f"{keycode} {label}".lower()
-            
+        for category, keycode, search_text in keycode_search_index():
             if search_value in search_text:
                 found_any = True
                 
@@ -7642,8 +8054,8 @@ class KMKConfigurator(QMainWindow):
         
         if self.selected_key_coords:
             row, col = self.selected_key_coords
-            self.keymap_data[self.current_layer][row][col] = keycode
-            self.update_macropad_display()
+            self.keymap_data[self.current_layer][row][col] = sys.intern(keycode)
+            self.update_macropad_cells([(row, col)])
         else:
             QMessageBox.warning(self, "No Key Selected", "Please select a key on the grid before assigning a keycode.")
 
@@ -7658,8 +8070,8 @@ class KMKConfigurator(QMainWindow):
             combo_string = dialog.get_combo_string()
             if combo_string:
                 row, col = self.selected_key_coords
-                self.keymap_data[self.current_layer][row][col] = combo_string
-                self.update_macropad_display()
+                self.keymap_data[self.current_layer][row][col] = sys.intern(combo_string)
+                self.update_macropad_cells([(row, col)])
 
     # --- Macro Management ---
     def add_macro(self):
@@ -7712,11 +8124,7 @@ class KMKConfigurator(QMainWindow):
 
             if name != new_name:
                 # Update keymap if macro name changed
-                for layer in self.keymap_data:
-                    for r in range(len(layer)):
-                        for c in range(len(layer[r])):
-                            if layer[r][c] == f"MACRO({name})":
-                                layer[r][c] = f"MACRO({new_name})"
+                self._replace_keymap_key(f"MACRO({name})", f"MACRO({new_name})")
                 del self.macros[name]
 
             self.macros[new_name] = new_sequence
@@ -7725,6 +8133,18 @@ class KMKConfigurator(QMainWindow):
             # Persist macros after edit
             self.save_macros()
 
+    def _replace_keymap_key(self, old, new):
+        """Replace every occurrence of keycode *old* in all layers with *new*."""
+        # Interned keys let the equality checks below hit the identity fast path
+        old = sys.intern(old)
+        new = sys.intern(new)
+        for layer in self.keymap_data:
+            for row in layer:
+                if old in row:  # C-level scan; most rows hold no match
+                    for c, key in enumerate(row):
+                        if key == old:
+                            row[c] = new
+
     def remove_macro(self):
         """
         Remove a macro from the configuration.
@@ -7750,11 +8170,7 @@ class KMKConfigurator(QMainWindow):
             if name in self.macros:
                 del self.macros[name]
             # Replace macro occurrences in the keymap with the default key
-            for layer in self.keymap_data:
-                for r in range(len(layer)):
-                    for c in range(len(layer[r])):
-                        if layer[r][c] == f"MACRO({name})":
-                            layer[r][c] = DEFAULT_KEY
+            self._replace_keymap_key(f"MACRO({name})", DEFAULT_KEY)
             self.update_macro_list()
             self.update_macropad_display()
             # Persist macros after removal
@@ -7767,18 +8183,23 @@ class KMKConfigurator(QMainWindow):
         Updates the keycode list if Macros category is active, updates
         the Macros button count, and updates left panel list if it exists.
         """
+        # Every change to self.macros ends here, so this is the one place the
+        # names are sorted; select_category reuses the stored result
+        sorted_names = self._sorted_macro_names = sorted(self.macros)
+
         # Update left panel list if it exists
         if hasattr(self, 'macro_list_widget'):
+            self.macro_list_widget.blockSignals(True)
             self.macro_list_widget.clear()
-            self.macro_list_widget.addItems(sorted(self.macros.keys()))
-            # Allow double-clicking a macro name in the left list to edit it
-            self.macro_list_widget.itemDoubleClicked.connect(lambda item: self.edit_macro_by_name(item.text()))
+            self.macro_list_widget.addItems(sorted_names)
+            self.macro_list_widget.blockSignals(False)
         
         # Update keycode list if Macros category is active
         if hasattr(self, 'current_category') and self.current_category == "Macros":
+            self.keycode_list.blockSignals(True)
             self.keycode_list.clear()
-            macro_keys = [f"MACRO({name})" for name in sorted(self.macros.keys())]
-            self.keycode_list.addItems(macro_keys)
+            self.keycode_list.addItems([f"MACRO({name})" for name in sorted_names])
+            self.keycode_list.blockSignals(False)
         
         # Update Macros button count
         if hasattr(self, 'category_buttons') and "Macros" in self.category_buttons:
@@ -7802,44 +8223,37 @@ class KMKConfigurator(QMainWindow):
                 return
             # Update keymap references if name changed
             if new_name != name:
-                for layer in self.keymap_data:
-                    for r in range(len(layer)):
-                        for c in range(len(layer[r])):
-                            if layer[r][c] == f"MACRO({name})":
-                                layer[r][c] = f"MACRO({new_name})"
+                self._replace_keymap_key(f"MACRO({name})", f"MACRO({new_name})")
                 del self.macros[name]
             self.macros[new_name] = new_sequence
             self.update_macro_list()
             self.update_macropad_display()
             self.save_macros()
 
-    def eventFilter(self, obj, event):
-        # Handle double-clicks on macropad buttons to edit/create macros
-        if event.type() == QEvent.Type.MouseButtonDblClick:
-            # If one of our macropad buttons was double-clicked
-            for coords, btn in self.macropad_buttons.items():
-                if obj is btn:
-                    r, c = coords
-                    key_text = self.keymap_data[self.current_layer][r][c]
-                    m = re.match(r"MACRO\((\w+)\)", key_text)
-                    if m:
-                        macro_name = m.group(1)
-                        self.edit_macro_by_name(macro_name)
-                        return True
-                    # If no macro is assigned to the key, open a key-capture dialog
-                    # so the user can press a key on their keyboard to assign it.
-                    dlg = KeyCaptureDialog(self)
-                    if dlg.exec() and dlg.captured:
-                        captured = dlg.captured
-                        # Assign the captured keycode directly to the key
-                        self.keymap_data[self.current_layer][r][c] = captured
-                        # Mark profile as custom
-                        if hasattr(self, 'profile_combo'):
-                            self.profile_combo.setCurrentText("Custom")
-                        self.update_macropad_display()
-                        return True
-                    return False
-        return False
+    def on_key_double_clicked(self, r, c):
+        """Handle double-clicks on macropad buttons to edit/create macros."""
+        key_text = self.keymap_data[self.current_layer][r][c]
+        m = MACRO_KEY_PATTERN.match(key_text)
+        if m:
+            macro_name = m.group(1)
+            self.edit_macro_by_name(macro_name)
+            return
+        # If no macro is assigned to the key, open a key-capture dialog
+        # so the user can press a key on their keyboard to assign it.
+        # The dialog is parented to the window, so it is built once and
+        # reused instead of piling up a new child per double-click.
+        dlg = self._key_capture_dialog
+        if dlg is None:
+            dlg = self._key_capture_dialog = KeyCaptureDialog(self)
+        dlg.captured = None
+        if dlg.exec() and dlg.captured:
+            captured = dlg.captured
+            # Assign the captured keycode directly to the key
+            self.keymap_data[self.current_layer][r][c] = captured
+            # Mark profile as custom
+            if hasattr(self, 'profile_combo'):
+                self.profile_combo.setCurrentText("Custom")
+            self.update_macropad_cells([(r, c)])
 
     def on_macro_selected(self, item):
         """Assign the clicked macro to the currently-selected key on the grid."""
@@ -7851,8 +8265,8 @@ class KMKConfigurator(QMainWindow):
             return
         row, col = self.selected_key_coords
         # Assign as MACRO(name) string used in the keymap
-        self.keymap_data[self.current_layer][row][col] = f"MACRO({macro_name})"
-        self.update_macropad_display()
+        self.keymap_data[self.current_layer][row][col] = sys.intern(f"MACRO({macro_name})")
+        self.update_macropad_cells([(row, col)])
         # Persist macros file (macros themselves not changed, but we save config-less macro references aren't stored)
         # However save keymap state via save_configuration_dialog if you want to persist the keymap to disk.
 
@@ -7920,7 +8334,12 @@ import busio
 import displayio
 import terminalio
 import adafruit_displayio_sh1106
-from adafruit_display_text import label
+# bitmap_label draws each label into one bitmap - much less RAM than the
+# TileGrid-per-glyph label module, with the same Label(...) API
+try:
+    from adafruit_display_text import bitmap_label as label
+except ImportError:
+    from adafruit_display_text import label
 from i2cdisplaybus import I2CDisplayBus
 
 # I2C Display setup (SDA=GP20, SCL=GP21)
@@ -7980,76 +8399,31 @@ display.root_group = splash
         """Generates display code with support for showing different layer keymaps."""
         rows = self.rows
         cols = self.cols
+
+        # The output depends only on the grid size and the keymap, so repeated
+        # saves of an unchanged keymap reuse the previous result
+        cache_key = (rows, cols, tuple(tuple(tuple(row) for row in layer) for layer in self.keymap_data))
+        if self._display_code_cache is not None and self._display_code_cache[0] == cache_key:
+            return self._display_code_cache[1]
+
         col_spacing = max(1, 128 // max(cols, 1))
         header_offset = 14
         row_spacing = max(1, (64 - header_offset) // max(rows, 1))
         x_offset = 1
         y_offset = header_offset
 
-        # Helper function to abbreviate key names for display
-        def abbreviate_key(key_str):
-            if not key_str or key_str == "KC.NO" or key_str == "KC.TRNS":
-                return "---"
-            
-            # Handle macros
-            if key_str.startswith("MACRO("):
-                macro_name = key_str[6:-1]  # Extract name from MACRO(name)
-                return macro_name[:4] if len(macro_name) > 4 else macro_name
-            
-            # Handle layer switches
-            if "MO(" in key_str or "TG(" in key_str or "TO(" in key_str:
-                return key_str.replace("KC.", "")[:4]
-            
-            # Handle key combinations (e.g., KC.LCTL(KC.C))
-            if "(" in key_str:
-                # Simplify combinations like LCTL(C) -> C^C
-                parts = key_str.replace("KC.", "").replace("(", "+").replace(")", "")
-                return parts[:4]
-            
-            # Standard keys - remove KC. prefix
-            key = key_str.replace("KC.", "")
-            
-            # Common abbreviations for display (max 4 chars for small OLED)
-            abbreviations = {
-                # Modifiers (3 chars)
-                "LCTL": "LCt", "RCTL": "RCt",
-                "LSFT": "LSh", "RSFT": "RSh", 
-                "LALT": "LAl", "RALT": "RAl",
-                "LGUI": "LWi", "RGUI": "RWi",
-                # Common actions (3-4 chars)
-                "BSPC": "BkSp", "ENT": "Ent",
-                "SPC": "Spc", "TAB": "Tab",
-                "ESC": "Esc", "DEL": "Del",
-                # Navigation (3-4 chars)
-                "PGUP": "PgUp", "PGDN": "PgDn",
-                "HOME": "Hom", "END": "End",
-                "UP": "Up", "DOWN": "Dwn",
-                "LEFT": "Lft", "RGHT": "Rgt",
-                # Media (3-4 chars)
-                "VOLU": "V+", "VOLD": "V-",
-                "MUTE": "Mut", "MPLY": "Ply",
-                "MNXT": "Nxt", "MPRV": "Prv",
-                "MSTP": "Stp", "EJCT": "Ejt",
-                "BRIU": "B+", "BRID": "B-",
-                # Numbers stay as-is
-                "N1": "1", "N2": "2", "N3": "3", "N4": "4", "N5": "5",
-                "N6": "6", "N7": "7", "N8": "8", "N9": "9", "N0": "0",
-                # Function keys
-                "F1": "F1", "F2": "F2", "F3": "F3", "F4": "F4",
-                "F5": "F5", "F6": "F6", "F7": "F7", "F8": "F8",
-                "F9": "F9", "F10": "F10", "F11": "F11", "F12": "F12",
-            }
-            
-            key = abbreviations.get(key, key)
-            return key[:4] if len(key) > 4 else key
-        
-        # Build display code with all layers
-        code = '''import board
+        # Build display code with all layers (collected as fragments and joined once)
+        parts = ['''import board
 import busio
 import displayio
 import terminalio
 import adafruit_displayio_sh1106
-from adafruit_display_text import label
+# bitmap_label draws each label into one bitmap - much less RAM than the
+# TileGrid-per-glyph label module, with the same Label(...) API
+try:
+    from adafruit_display_text import bitmap_label as label
+except ImportError:
+    from adafruit_display_text import label
 from i2cdisplaybus import I2CDisplayBus
 
 # I2C Display setup (SDA=GP20, SCL=GP21)
@@ -8063,50 +8437,95 @@ display = adafruit_displayio_sh1106.SH1106(
     rotation=180,  # Rotated 180 degrees
     colstart=2  # Column offset for proper alignment
 )
+# Push frames explicitly: one refresh (a single I2C burst) per layer update
+# instead of a transfer for every label change
+display.auto_refresh = False
 
 # Create display group
 splash = displayio.Group()
 display.root_group = splash
 
 # All layer keymaps - Generated from your configuration
-'''
+''']
+        append = parts.append
         
-        # Generate key labels for ALL layers
-        code += "all_layer_labels = [\n"
+        # Generate key labels for ALL layers, collecting every character the
+        # OLED can show (layer indicator included) for glyph preloading
+        glyph_chars = set("Layer 0123456789-")
+        append("all_layer_labels = [\n")
         for layer_idx, layer_data in enumerate(self.keymap_data):
-            code += f"    # Layer {layer_idx}\n"
-            code += "    [\n"
-            for r in range(rows - 1, -1, -1):
-                row_labels = []
-                for c in range(cols):
-                    if r < len(layer_data) and c < len(layer_data[r]):
-                        key_abbr = abbreviate_key(layer_data[r][c])
-                        row_labels.append(f'"{key_abbr}"')
-                    else:
-                        row_labels.append('"---"')
-                code += f"        [{', '.join(row_labels)}],\n"
-            code += "    ],\n"
-        code += "]\n\n"
+            append(f"    # Layer {layer_idx}\n    [\n")
+            # Pad the layer to `rows` rows once, then walk it bottom-up
+            padded_rows = [layer_data[r] if r < len(layer_data) else [] for r in range(rows)]
+            for row_keys in reversed(padded_rows):
+                row_labels = [abbreviate_display_key(key) for key in row_keys[:cols]]
+                row_labels += ["---"] * (cols - len(row_labels))
+                glyph_chars.update(*row_labels)
+                # json.dumps quotes/escapes the whole row in C and yields a valid
+                # Python list literal (non-ASCII becomes \uXXXX escapes)
+                append(f"        {json.dumps(row_labels)},\n")
+            append("    ],\n")
+        append("]\n\n")
+
+        # Load all glyphs in one go before any label exists; fonts that load on
+        # demand otherwise fetch glyphs one label at a time during first render.
+        # The built-in terminalio font is always resident, hence the guard.
+        append(
+            "# Preload every glyph used by the keymap view\n"
+            "if hasattr(terminalio.FONT, \"load_glyphs\"):\n"
+            f"    terminalio.FONT.load_glyphs({''.join(sorted(glyph_chars))!r})\n\n"
+        )
         
+        # The grid never moves, so work out every cell's pixel position here
+        # rather than on the device (columns run right-to-left on the OLED)
+        append("# Pixel position (x, y) of every key cell, row by row\nkey_positions = (\n")
+        for row_idx in range(rows):
+            y_pos = row_idx * row_spacing + y_offset
+            row_positions = tuple(
+                ((cols - 1 - col_idx) * col_spacing + x_offset, y_pos)
+                for col_idx in range(cols)
+            )
+            append(f"    {row_positions!r},\n")
+        append(")\n\n")
+
         # Add display update function
-        code += '''# Helper function to update display with current layer
+        append('''# Create the OLED labels once - label.Label construction is slow on
+# CircuitPython, so layer switches only rewrite the text of labels that change
+layer_label = label.Label(
+    terminalio.FONT,
+    text="Layer 0",
+    color=0xFFFFFF,
+    x=2,
+    y=4
+)
+splash.append(layer_label)
+
+key_cells = []
+for row, row_positions in zip(all_layer_labels[0], key_positions):
+    row_cells = []
+    for key_text, (x_pos, y_pos) in zip(row, row_positions):
+        text_area = label.Label(
+            terminalio.FONT,
+            text=key_text,
+            color=0xFFFFFF,
+            x=x_pos,
+            y=y_pos
+        )
+        splash.append(text_area)
+        row_cells.append(text_area)
+    key_cells.append(row_cells)
+display.refresh()
+
+# Helper function to update display with current layer
 def update_display_for_layer(layer_index):
     """Update OLED display to show keymap for the specified layer."""
-    global splash
-    
-    # Clear existing labels
-    while len(splash) > 0:
-        splash.pop()
-    
+    changed = False
+
     # Show layer indicator at top
-    layer_label = label.Label(
-        terminalio.FONT,
-        text=f"Layer {{layer_index}}",
-        color=0xFFFFFF,
-        x=2,
-        y=4
-    )
-    splash.append(layer_label)
+    layer_text = f"Layer {layer_index}"
+    if layer_label.text != layer_text:
+        layer_label.text = layer_text
+        changed = True
     
     # Get labels for this layer
     if layer_index < len(all_layer_labels):
@@ -8114,19 +8533,16 @@ def update_display_for_layer(layer_index):
     else:
         key_labels = all_layer_labels[0]  # Fallback to layer 0
     
-    # Display key layout (top row is physical top)
-    for row_idx, row in enumerate(key_labels):
-        for col_idx, key_text in enumerate(row):
-            x_pos = ({cols} - 1 - col_idx) * {col_spacing} + {x_offset}
-            y_pos = row_idx * {row_spacing} + {y_offset}
-            text_area = label.Label(
-                terminalio.FONT,
-                text=key_text,
-                color=0xFFFFFF,
-                x=x_pos,
-                y=y_pos
-            )
-            splash.append(text_area)
+    # Display key layout (top row is physical top), touching only changed cells
+    for row_cells, row in zip(key_cells, key_labels):
+        for text_area, key_text in zip(row_cells, row):
+            if text_area.text != key_text:
+                text_area.text = key_text
+                changed = True
+
+    # Send the whole frame at once, and only if something changed
+    if changed:
+        display.refresh()
 
 # Initial display - Show Layer 0
 update_display_for_layer(0)
@@ -8138,13 +8554,10 @@ class LayerDisplaySync:
 
     def _active_layer(self, keyboard):
         try:
-            layers = getattr(keyboard, "active_layers", None)
-            if layers and len(layers) > 0:
-                # Return the highest priority layer (last in the list)
-                return layers[-1]
-        except Exception:
-            pass
-        return 0
+            # Return the highest priority layer (last in the list)
+            return keyboard.active_layers[-1]
+        except (AttributeError, IndexError, TypeError):
+            return 0
 
     def _check_and_update(self, keyboard):
         """Check if layer changed and update display if needed."""
@@ -8167,14 +8580,15 @@ class LayerDisplaySync:
             pass
 
     def after_matrix_scan(self, keyboard):
-        """Check for layer changes after keys are scanned."""
-        self._check_and_update(keyboard)
+        # Key events (and thus layer changes) are processed after this hook,
+        # so checking here as well would only repeat the after_hid_send check
+        return
 
     def before_hid_send(self, keyboard):
         return
 
     def after_hid_send(self, keyboard):
-        """Check for layer changes after HID report is sent."""
+        """Check for layer changes once per scan cycle, after keys are processed."""
         self._check_and_update(keyboard)
 
     def on_powersave_enable(self, keyboard):
@@ -8185,8 +8599,10 @@ class LayerDisplaySync:
 
 layer_display_sync = LayerDisplaySync()
 keyboard.modules.append(layer_display_sync)
-'''.format(col_spacing=col_spacing, x_offset=x_offset, row_spacing=row_spacing, y_offset=y_offset, cols=cols)
-        
+''')
+
+        code = "".join(parts)
+        self._display_code_cache = (cache_key, code)
         return code
 
     
@@ -8203,7 +8619,7 @@ keyboard.modules.append(layer_display_sync)
         )
 
         num_keys = self.rows * self.cols
-        underglow_count = int(cfg.get('num_underglow', 0) or 0)
+        underglow_count = int(cfg.get('num_underglow') or 0)
         total_pixels = num_keys + max(0, underglow_count)
 
         keymap_layers = self.keymap_data or []
@@ -8213,13 +8629,18 @@ keyboard.modules.append(layer_display_sync)
         default_key_rgb = hex_to_rgb_list(cfg['default_key_color'])
         default_under_rgb = hex_to_rgb_list(cfg['default_underglow_color'])
 
+        # Color maps are JSON-backed and keyed by stringified indices; build the
+        # string keys once instead of calling str(idx) for every key of every layer
+        index_keys = [str(idx) for idx in range(max(num_keys, underglow_count))]
+
         key_entries_by_layer = []
         for layer_idx in range(num_layers):
             layer_data = keymap_layers[layer_idx] if 0 <= layer_idx < len(keymap_layers) else None
             entries = []
             overrides = layer_key_overrides.get(str(layer_idx), {}) or {}
             for idx in range(num_keys):
-                override_color = overrides.get(str(idx)) or global_key_map.get(str(idx))
+                idx_key = index_keys[idx]
+                override_color = overrides.get(idx_key) or global_key_map.get(idx_key)
                 if override_color:
                     rgb = hex_to_rgb_list(override_color)
                 else:
@@ -8242,32 +8663,43 @@ keyboard.modules.append(layer_display_sync)
             key_entries_by_layer.append(entries)
 
         under_map = cfg.get('underglow_colors', {}) or {}
-        under_entries_rgb = []
-        for idx in range(max(0, underglow_count)):
-            custom = under_map.get(str(idx))
-            if custom:
-                under_entries_rgb.append(hex_to_rgb_list(custom))
-            else:
-                under_entries_rgb.append(default_under_rgb.copy())
+        under_entries_rgb = [
+            hex_to_rgb_list(custom) if (custom := under_map.get(index_keys[idx])) else default_under_rgb.copy()
+            for idx in range(max(0, underglow_count))
+        ]
+
+        # Most entries share the default color, so format each distinct color once
+        formatted_rgb = {}
+
+        def format_rgb(rgb):
+            key = tuple(rgb)
+            text = formatted_rgb.get(key)
+            if text is None:
+                text = formatted_rgb[key] = f"[{key[0]}, {key[1]}, {key[2]}]"
+            return text
 
         def format_entries(entries):
             if not entries:
                 return "[]"
-            chunks = []
-            for start in range(0, len(entries), 8):
-                chunk = ", ".join(f"[{rgb[0]}, {rgb[1]}, {rgb[2]}]" for rgb in entries[start:start+8])
-                chunks.append(f"                {chunk}")
-            return "[\n" + ",\n".join(chunks) + "\n            ]"
+            # Format every entry in one pass, then emit 8 per line
+            formatted = [format_rgb(rgb) for rgb in entries]
+            body = ",\n".join(
+                "                " + ", ".join(formatted[start:start + 8])
+                for start in range(0, len(formatted), 8)
+            )
+            return f"[\n{body}\n            ]"
 
         keys_array = format_entries(key_entries_by_layer[0] if key_entries_by_layer else [])
         under_array = format_entries(under_entries_rgb)
 
-        layer_rgb_maps = []
-        for entries in key_entries_by_layer:
-            combined = [list(rgb) for rgb in entries]
-            if under_entries_rgb:
-                combined.extend([list(rgb) for rgb in under_entries_rgb])
-            layer_rgb_maps.append(combined)
+        # Most keys share a handful of colors, so each distinct color is emitted
+        # once as a named list and the per-layer maps reference it by name
+        # (LayerRgbSync copies the lists it applies, so sharing is safe)
+        palette = {}  # (r, g, b) -> variable name in the generated code
+        layer_rgb_names = [
+            [palette.setdefault(tuple(rgb), f"_C{len(palette)}") for rgb in entries + under_entries_rgb]
+            for entries in key_entries_by_layer
+        ]
 
         rgb_order = cfg.get('rgb_order', 'GRB')
         order_tuple = RGB_ORDER_TUPLES.get(rgb_order, RGB_ORDER_TUPLES['GRB'])
@@ -8276,7 +8708,7 @@ keyboard.modules.append(layer_display_sync)
             disable_auto_write = disable_auto_write_value.strip().lower() not in {"false", "0", "no", "off"}
         else:
             disable_auto_write = bool(disable_auto_write_value)
-        brightness = float(cfg.get('brightness_limit', 0.5) or 0.5)
+        brightness = float(cfg.get('brightness_limit') or 0.5)
         pixel_pin = cfg.get('pixel_pin', FIXED_RGB_PIN)
         if isinstance(pixel_pin, str):
             pixel_pin = pixel_pin.strip()
@@ -8323,8 +8755,17 @@ keyboard.modules.append(layer_display_sync)
             "keyboard.extensions.append(rgb)\n",
         ])
 
-        layer_rgb_maps_str = json.dumps(layer_rgb_maps, indent=4)
-        code_lines.append("layer_rgb_maps = " + layer_rgb_maps_str)
+        code_lines.append("# Distinct LED colors shared by the per-layer maps")
+        code_lines.extend(f"{name} = [{r}, {g}, {b}]" for (r, g, b), name in palette.items())
+        code_lines.append("layer_rgb_maps = [")
+        for names in layer_rgb_names:
+            code_lines.append("    [")
+            code_lines.extend(
+                "        " + ", ".join(names[start:start + 8]) + ","
+                for start in range(0, len(names), 8)
+            )
+            code_lines.append("    ],")
+        code_lines.append("]")
         code_lines.append("")
         code_lines.extend([
             "class LayerRgbSync:",
@@ -8402,56 +8843,50 @@ keyboard.modules.append(layer_display_sync)
     
     def get_generated_python_code(self):
         """Constructs the final `code.py` file content as a string."""
+        buffer = io.StringIO()
+        self.write_generated_python_code(buffer)
+        return buffer.getvalue()
+
+    def write_generated_python_code(self, fp) -> None:
+        """
+        Stream the final `code.py` content into a text file object.
+
+        Sections (imports, hardware, extension snippets, macros, keymap, RGB)
+        are written one after another instead of being concatenated into one
+        large string first, so saving to disk never holds a second full copy
+        of the file in memory. get_generated_python_code() wraps this with an
+        io.StringIO for callers that need the text.
+
+        Args:
+            fp: Writable text stream (open file, io.StringIO, ...)
+        """
+        write = fp.write
         macros_exist = bool(self.macros)
         
         # --- Macro Definitions ---
-        macros_def_str = ""
+        # Sections are collected as lists of parts and joined once, rather
+        # than grown with repeated string concatenation
+        macros_def_parts = []
         if macros_exist:
-            macros_def_str += "# --- Macro Definitions ---\n"
+            macros_def_parts.append("# --- Macro Definitions ---\n")
             for name, sequence in self.macros.items():
                 sequence_str = []
                 for action_type, value in sequence:
                     if action_type == 'text':
-                        escaped_value = value.replace('"', '\\"')
-                        sequence_str.append(f'"{escaped_value}"')
-                    elif action_type in ('tap', 'press', 'release'):
-                         sequence_str.append(f'{action_type.title()}({value})')
+                        # JSON string escapes are valid Python ones and cover
+                        # backslashes and control characters, not just quotes
+                        sequence_str.append(json.dumps(value, ensure_ascii=False))
+                    elif action_type in MACRO_ACTION_CONSTRUCTORS:
+                        sequence_str.append(f'{MACRO_ACTION_CONSTRUCTORS[action_type]}({value})')
                     elif action_type == 'delay':
                         sequence_str.append(f"Delay({value})")
-                macros_def_str += f'{name} = KC.MACRO({", ".join(sequence_str)})\n'
-            macros_def_str += "\n"
-
-        # --- Keymap Definition ---
-        keymap_str = "keyboard.keymap = [\n"
-        for i, layer in enumerate(self.keymap_data):
-            keymap_str += f"    # Layer {i}\n    [\n"
-            # Flatten the keymap - KMK expects a flat list, not nested rows
-            flat_keys = []
-            for row in layer:
-                for key in row:
-                    macro_match = re.match(r"MACRO\((\w+)\)", key)
-                    if macro_match:
-                        flat_keys.append(macro_match.group(1)) # Use the macro variable name
-                    else:
-                        flat_keys.append(key) # This is a regular keycode or combo
-            # Write flat keymap with 4 keys per line for readability (matches 4 columns)
-            for idx in range(0, len(flat_keys), 4):
-                line_keys = flat_keys[idx:idx+4]
-                keymap_str += "        " + ", ".join(line_keys) + ",\n"
-            keymap_str += "    ],\n"
-        keymap_str += "]\n"
+                macros_def_parts.append(f'{name} = KC.MACRO({", ".join(sequence_str)})\n')
+            macros_def_parts.append("\n")
 
         # --- Python File Template ---
         diode_orientation = self.diode_orientation
         
-        imports = [
-            "import board",
-            "from kmk.kmk_keyboard import KMKKeyboard",
-            "from kmk.keys import KC",
-            "from kmk.scanners import DiodeOrientation",
-            "from kmk.modules.layers import Layers",
-            "from kmk.extensions.media_keys import MediaKeys",
-        ]
+        imports = list(CODE_PY_BASE_IMPORTS)
         if macros_exist:
             imports.append("from kmk.modules.macros import Macros, Tap, Press, Release, Delay")
         # Optional extension imports
@@ -8462,53 +8897,39 @@ keyboard.modules.append(layer_display_sync)
         # RGB import will be wrapped in try-except in the code body since it requires neopixel
 
         # Build extension snippets provided by the user
-        ext_snippets = ""
+        ext_snippets = []
         encoder_needs_layer_cycler = False
         if self.enable_encoder and self.encoder_config_str:
-            ext_snippets += "# Encoder configuration:\n"
-            ext_snippets += self.encoder_config_str + "\n\n"
+            ext_snippets.append("# Encoder configuration:\n")
+            ext_snippets.append(self.encoder_config_str + "\n\n")
             # Check if layer cycler class is defined in the encoder config
             if "class LayerCycler:" in self.encoder_config_str:
                 encoder_needs_layer_cycler = True
         if self.enable_analogin and self.analogin_config_str:
-            ext_snippets += "# AnalogIn configuration provided by user:\n"
-            ext_snippets += self.analogin_config_str + "\n\n"
+            ext_snippets.append("# AnalogIn configuration provided by user:\n")
+            ext_snippets.append(self.analogin_config_str + "\n\n")
         if self.enable_display:
             # Auto-generate display layout showing keymap
             # Use layer-aware version if encoder with layer cycling is enabled
             if self.enable_encoder and "LayerCycler" in self.encoder_config_str:
-                ext_snippets += "# Display configuration - Layer-aware keymap layout:\n"
-                ext_snippets += self.generate_display_layout_code_with_layer_support() + "\n\n"
+                ext_snippets.append("# Display configuration - Layer-aware keymap layout:\n")
+                ext_snippets.append(self.generate_display_layout_code_with_layer_support() + "\n\n")
             else:
-                ext_snippets += "# Display configuration - Auto-generated keymap layout:\n"
-                ext_snippets += self.generate_display_layout_code() + "\n\n"
+                ext_snippets.append("# Display configuration - Auto-generated keymap layout:\n")
+                ext_snippets.append(self.generate_display_layout_code() + "\n\n")
         
         # Add custom extension code if present
         if self.custom_ext_code and self.custom_ext_code.strip():
-            ext_snippets += "# Custom Extension Code:\n"
-            ext_snippets += self.custom_ext_code.strip() + "\n\n"
+            ext_snippets.append("# Custom Extension Code:\n")
+            ext_snippets.append(self.custom_ext_code.strip() + "\n\n")
         
         # Provide sensible default templates for enabled modules (placed before user snippets)
         # Only add defaults if user hasn't provided their own config
-        default_snippets = ""
+        default_snippets = []
         if self.enable_encoder and not self.encoder_config_str:
-            default_snippets += "# --- Encoder Handler (auto-generated) ---\n"
-            default_snippets += (
-                "encoder_handler = EncoderHandler()\n"
-                "# Configure pins and map for your hardware. Examples:\n"
-                "# encoder_handler.pins = ((board.GP17, board.GP15, board.GP14),)\n"
-                "# encoder_handler.map = [ ((KC.VOLD, KC.VOLU, KC.MUTE),), ]\n"
-                "keyboard.modules.append(encoder_handler)\n\n"
-            )
+            default_snippets.append(CODE_PY_DEFAULT_ENCODER_SNIPPET)
         if self.enable_analogin and not self.analogin_config_str:
-            default_snippets += "# --- Analog Inputs (auto-generated) ---\n"
-            default_snippets += (
-                "# Example usage (requires 'analogio' on target device):\n"
-                "# from analogio import AnalogIn\n"
-                "# a0 = AnalogInput(AnalogIn(board.A0))\n"
-                "# analog = AnalogInputs([a0], [[AnalogKey(KC.X)]])\n"
-                "# keyboard.modules.append(analog)\n\n"
-            )
+            default_snippets.append(CODE_PY_DEFAULT_ANALOGIN_SNIPPET)
         # RGB will be initialized AFTER keymap definition
         rgb_init_code = ""
         if self.enable_rgb:
@@ -8516,8 +8937,9 @@ keyboard.modules.append(layer_display_sync)
             rgb_init_code = self._generate_rgb_matrix_code()
 
         # Final extension snippets: defaults first, then user-provided overrides/additions
-        ext_snippets_final = default_snippets + ext_snippets
-        code_template = f"""# Generated by KMK Configurator
+        ext_snippets_final = "".join(default_snippets + ext_snippets)
+        macros_def_str = "".join(macros_def_parts)
+        write(f"""# Generated by KMK Configurator
 {chr(10).join(imports)}
 
 keyboard = KMKKeyboard()
@@ -8527,94 +8949,123 @@ keyboard.extensions.append(MediaKeys())
 
 # --- Modules ---
 keyboard.modules.append(Layers())
-"""
+""")
         if macros_exist:
-            code_template += "keyboard.modules.append(Macros())\n"
+            write("keyboard.modules.append(Macros())\n")
 
-        code_template += f"""
+        write(f"""
 # --- Hardware Settings ---
 keyboard.diode_orientation = DiodeOrientation.{diode_orientation}
 keyboard.col_pins = ({', '.join(self.col_pins)},)
 keyboard.row_pins = ({', '.join(self.row_pins)},)
 
 {ext_snippets_final}{macros_def_str}# --- Keymap ---
-{keymap_str}
-{rgb_init_code}"""
+""")
+
+        # --- Keymap Definition ---
+        write("keyboard.keymap = [\n")
+        for i, layer in enumerate(self.keymap_data):
+            write(f"    # Layer {i}\n    [\n")
+            # Flatten the keymap - KMK expects a flat list, not nested rows.
+            # Macro references become the macro variable name; the cheap prefix
+            # check keeps the regex off the (vastly more common) plain keycodes.
+            flat_keys = [
+                macro_match.group(1)
+                if key.startswith("MACRO(") and (macro_match := MACRO_KEY_PATTERN.match(key))
+                else key
+                for key in itertools.chain.from_iterable(layer)
+            ]
+            # Write flat keymap with 4 keys per line for readability (matches 4 columns)
+            for idx in range(0, len(flat_keys), 4):
+                write(f"        {', '.join(flat_keys[idx:idx+4])},\n")
+            write("    ],\n")
+        write("]\n\n")
+        write(rgb_init_code)
+
         # Add layer cycler initialization if encoder needs it
         if encoder_needs_layer_cycler:
-            code_template += """# Initialize layer cycler for encoder (after keymap is defined)
+            write("""# Initialize layer cycler for encoder (after keymap is defined)
 layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
 
-"""
+""")
         
-        code_template += """if __name__ == '__main__':
-    keyboard.go()
-"""
-        return code_template.strip()
+        # No trailing newline, matching the historical stripped output
+        write("""if __name__ == '__main__':
+    keyboard.go()""")
 
-    def find_circuitpy_drive(self):
-        """Attempts to find a drive named CIRCUITPY on common mount points."""
-        if sys.platform == "win32":
-            import string
-            # Check drives D: through Z:
-            for letter in string.ascii_uppercase[3:]:
-                path = f"{letter}:\\"
-                if os.path.exists(os.path.join(path, "boot_out.txt")):
-                    return path
-        elif sys.platform == "darwin": # macOS
-            path = "/Volumes/CIRCUITPY"
-            if os.path.exists(path):
-                return path
-        else:  # Linux
-            username = os.getlogin()
-            for base_path in [f"/media/{username}", f"/run/media/{username}"]:
-                path = os.path.join(base_path, "CIRCUITPY")
-                if os.path.exists(path):
-                    return path
-        return BASE_DIR  # Fallback to application directory
-    
     def find_board_drive(self, drive_name="CIRCUITPY"):
         """Find a specific board drive by name.
         
+        The last location found for each name is cached and re-validated
+        first, so repeated exports skip the full mount-point scan while the
+        board stays plugged in; a stale entry (board unplugged or moved to a
+        different drive letter) falls back to a fresh scan.
+        
         Args:
             drive_name: Name of the drive to find (e.g., 'CIRCUITPY', 'CHRONOSPAD')
             
         Returns:
             str: Path to the drive if found, None otherwise
         """
+        cached_path = self._board_drive_cache.get(drive_name)
+        if cached_path and self._is_board_drive(cached_path, drive_name):
+            return cached_path
+
+        drive_path = self._scan_for_board_drive(drive_name)
+        if drive_path:
+            self._board_drive_cache[drive_name] = drive_path
+        else:
+            self._board_drive_cache.pop(drive_name, None)
+        return drive_path
+
+    @staticmethod
+    def _windows_volume_label(drive):
+        """Return the volume label of a removable/fixed Windows drive, or None."""
+        from ctypes import windll, create_unicode_buffer
+
+        drive_type = windll.kernel32.GetDriveTypeW(drive)
+        # DRIVE_REMOVABLE = 2, DRIVE_FIXED = 3
+        if drive_type not in (2, 3):
+            return None
+        # Get volume label
+        volume_name_buffer = create_unicode_buffer(261)
+        file_system_buffer = create_unicode_buffer(261)
+        result = windll.kernel32.GetVolumeInformationW(
+            drive,
+            volume_name_buffer,
+            261,
+            None,
+            None,
+            None,
+            file_system_buffer,
+            261
+        )
+        return volume_name_buffer.value if result else None
+
+    def _is_board_drive(self, path, drive_name):
+        """Check that a previously found drive path still holds the named board."""
+        import platform
+        if platform.system() == "Windows":
+            return self._windows_volume_label(path) == drive_name
+        return os.path.exists(path)
+
+    def _scan_for_board_drive(self, drive_name):
+        """Probe the platform's mount points for a drive labelled drive_name."""
         import platform
         system = platform.system()
         
         if system == "Windows":
             import string
-            from ctypes import windll, create_unicode_buffer
-            
-            # Check all drive letters
-            for letter in string.ascii_uppercase:
-                drive = f"{letter}:\\"
-                # Check if drive exists
-                drive_type = windll.kernel32.GetDriveTypeW(drive)
-                # DRIVE_REMOVABLE = 2, DRIVE_FIXED = 3
-                if drive_type in (2, 3):
-                    # Get volume label
-                    volume_name_buffer = create_unicode_buffer(261)
-                    file_system_buffer = create_unicode_buffer(261)
-                    
-                    result = windll.kernel32.GetVolumeInformationW(
-                        drive,
-                        volume_name_buffer,
-                        261,
-                        None,
-                        None,
-                        None,
-                        file_system_buffer,
-                        261
-                    )
-                    
-                    if result:
-                        volume_label = volume_name_buffer.value
-                        if volume_label == drive_name:
-                            return drive
+            from ctypes import windll
+            
+            # One call for the bitmask of present drive letters, so absent
+            # letters are skipped without querying each one
+            drive_mask = windll.kernel32.GetLogicalDrives()
+            for bit, letter in enumerate(string.ascii_uppercase):
+                if drive_mask & (1 << bit):
+                    drive = f"{letter}:\\"
+                    if self._windows_volume_label(drive) == drive_name:
+                        return drive
                     
         elif system == "Darwin":  # macOS
             path = f"/Volumes/{drive_name}"
@@ -8622,7 +9073,10 @@ layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
                 return path
                 
         else:  # Linux
-            username = os.getlogin()
+            import getpass
+            # getuser() reads $USER/$LOGNAME first; os.getlogin() needs a
+            # controlling terminal and raises OSError without one
+            username = getpass.getuser()
             for base_path in [f"/media/{username}", f"/run/media/{username}"]:
                 path = os.path.join(base_path, drive_name)
                 if os.path.exists(path):
@@ -8726,12 +9180,18 @@ layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
 
         if folder_path:
             file_path = os.path.join(folder_path, "code.py")
-            py_code_str = self.get_generated_python_code()
 
             try:
-                # Save code.py
-                with open(file_path, 'w') as f:
-                    f.write(py_code_str)
+                # Stream code.py into a temp file and swap it in, so the board
+                # never sees a half-written code.py if generation fails midway
+                tmp_path = file_path + ".tmp"
+                try:
+                    with open(tmp_path, 'w', buffering=65536) as f:
+                        self.write_generated_python_code(f)
+                    os.replace(tmp_path, file_path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
                 
                 # Check if kmk folder exists, if not copy it
                 # Note: Libraries are bundled in simplified structure:
@@ -8739,23 +9199,16 @@ layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
                 # - libraries/lib/ contains only essential CircuitPython 10.x libraries (formerly adafruit-circuitpython-bundle-10.x-mpy/lib)
                 # This reduced structure is bundled directly into the executable for offline functionality
                 kmk_dest = os.path.join(folder_path, "kmk")
-                if not os.path.exists(kmk_dest):
-                    kmk_source = os.path.join(BASE_DIR, "libraries", "kmk")
-                    if os.path.exists(kmk_source):
-                        import shutil
-                        shutil.copytree(kmk_source, kmk_dest)
-                        kmk_copied = True
-                    else:
-                        QMessageBox.warning(self, "Warning", 
-                            f"KMK firmware source not found at:\n{kmk_source}\n\n"
-                            f"Please run the application to auto-download dependencies or manually copy the kmk folder to {folder_path}")
-                        kmk_copied = False
-                else:
-                    kmk_copied = False
+                kmk_source = os.path.join(BASE_DIR, "libraries", "kmk")
+                copy_kmk = not os.path.exists(kmk_dest)
+                if copy_kmk and not (os.path.exists(KMK_BUNDLE_ZIP) or os.path.exists(kmk_source)):
+                    QMessageBox.warning(self, "Warning", 
+                        f"KMK firmware source not found at:\n{kmk_source}\n\n"
+                        f"Please run the application to auto-download dependencies or manually copy the kmk folder to {folder_path}")
+                    copy_kmk = False
                 
                 # Copy required libraries from bundled CircuitPython 10.x libs
                 lib_source = os.path.join(BASE_DIR, "libraries", "lib")
-                lib_dest = os.path.join(folder_path, "lib")
                 
                 if not os.path.exists(lib_source):
                     QMessageBox.warning(self, "Warning",
@@ -8769,36 +9222,6 @@ layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
                         f"Expected location: {lib_source}")
                     lib_source = None
                 
-                # Create lib folder if it doesn't exist
-                os.makedirs(lib_dest, exist_ok=True)
-                
-                # Required libraries list
-                required_libs = [
-                    "adafruit_displayio_sh1106.mpy",
-                    "adafruit_display_text",  # folder
-                    "neopixel.mpy"
-                ]
-                
-                copied_files = []
-                if lib_source:  # Only copy if libraries were found
-                    for lib_name in required_libs:
-                        src = os.path.join(lib_source, lib_name)
-                        dst = os.path.join(lib_dest, lib_name)
-                        
-                        if os.path.exists(src):
-                            if os.path.isdir(src):
-                                # Copy directory
-                                if os.path.exists(dst):
-                                    import shutil
-                                    shutil.rmtree(dst)
-                                shutil.copytree(src, dst)
-                                copied_files.append(f"{lib_name}/ (folder)")
-                            else:
-                                # Copy file
-                                import shutil
-                                shutil.copy2(src, dst)
-                                copied_files.append(lib_name)
-                
                 # Save boot.py if configured
                 boot_saved = False
                 if self.boot_config_str and self.boot_config_str.strip():
@@ -8809,7 +9232,6 @@ layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
                         boot_saved = True
                         
                         # Extract and save custom drive name from boot.py
-                        import re
                         label_match = re.search(r'storage\.getmount\("/"\)\.label\s*=\s*["\']([^"\']+)["\']', 
                                               self.boot_config_str)
                         if label_match:
@@ -8826,23 +9248,65 @@ layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
                     except Exception as e:
                         QMessageBox.warning(self, "Warning", f"Could not save boot.py:\n{e}")
                 
-                msg = f"code.py saved successfully to:\n{file_path}\n\n"
-                if kmk_copied:
-                    msg += f"✓ KMK firmware copied to {kmk_dest}\n\n"
-                if boot_saved:
-                    msg += f"✓ boot.py saved to {os.path.join(folder_path, 'boot.py')}\n\n"
-                
-                if copied_files:
-                    msg += f"✓ Libraries copied from CircuitPython 10.x bundle to {lib_dest}:\n" + "\n".join(f"  • {f}" for f in copied_files)
-                else:
-                    msg += f"⚠️ No libraries were copied.\n\n"
-                    msg += "CircuitPython 10.x libraries not found.\n"
-                    msg += "Please restart the app to download dependencies automatically."
-                
-                QMessageBox.information(self, "Success", msg)
+                # The firmware/library copy is slow on the USB mass-storage drive, so
+                # it runs on a worker thread behind a progress dialog; the summary is
+                # shown from on_board_copy_finished once it completes
+                self.board_copy_progress = QProgressDialog("Copying libraries to the board...", None, 0, 100, self)
+                self.board_copy_progress.setWindowTitle("Saving to Board")
+                self.board_copy_progress.setWindowModality(Qt.WindowModality.WindowModal)
+                self.board_copy_progress.setAutoClose(False)
+                self.board_copy_progress.setAutoReset(False)
+                self.board_copy_progress.setCancelButton(None)  # Partial copies would leave a broken board
+                self.board_copy_progress.show()
+
+                self.board_copier = BoardLibraryCopier(folder_path, copy_kmk, kmk_source, lib_source)
+                self.board_copier.progress.connect(self.on_board_copy_progress)
+                self.board_copier.finished.connect(
+                    partial(self.on_board_copy_finished, file_path, folder_path, boot_saved)
+                )
+                self.board_copier.start()
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Could not save code.py file:\n{e}")
 
+    def on_board_copy_progress(self, message, percentage):
+        """Reflect BoardLibraryCopier progress in the export progress dialog."""
+        self.board_copy_progress.setLabelText(message)
+        self.board_copy_progress.setValue(percentage)
+
+    def on_board_copy_finished(self, file_path, folder_path, boot_saved, success):
+        """
+        Summarize a code.py export once the background library copy completes.
+
+        Args:
+            file_path: Path of the code.py that was written
+            folder_path: Board folder the libraries were copied into
+            boot_saved: Whether boot.py was written alongside code.py
+            success: Result emitted by BoardLibraryCopier.finished
+        """
+        self.board_copy_progress.close()
+        copier = self.board_copier
+
+        if not success:
+            QMessageBox.critical(self, "Error", f"Could not copy libraries to the board:\n{copier.error}")
+            return
+
+        kmk_dest = os.path.join(folder_path, "kmk")
+        lib_dest = os.path.join(folder_path, "lib")
+        msg = f"code.py saved successfully to:\n{file_path}\n\n"
+        if copier.kmk_copied:
+            msg += f"✓ KMK firmware copied to {kmk_dest}\n\n"
+        if boot_saved:
+            msg += f"✓ boot.py saved to {os.path.join(folder_path, 'boot.py')}\n\n"
+        
+        if copier.copied_files:
+            msg += f"✓ Libraries copied from CircuitPython 10.x bundle to {lib_dest}:\n" + "\n".join(f"  • {f}" for f in copier.copied_files)
+        else:
+            msg += f"⚠️ No libraries were copied.\n\n"
+            msg += "CircuitPython 10.x libraries not found.\n"
+            msg += "Please restart the app to download dependencies automatically."
+        
+        QMessageBox.information(self, "Success", msg)
+
     def save_configuration_dialog(self):
         # Ensure config save directory exists
         os.makedirs(CONFIG_SAVE_DIR, exist_ok=True)
@@ -8888,6 +9352,8 @@ layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
         
         Note: Only macros that are actually used in the keymap are saved with the config.
         All macros remain in the global macros.json file as well.
+
+        Errors are raised to the caller, which reports them to the user.
         """
         config_data = {
             "version": "2.0",  # New version format
@@ -8926,12 +9392,11 @@ layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
             "boot_config": self.boot_config_str,  # Save boot.py configuration
         }
 
-        try:
-            with open(file_path, 'w') as f:
-                json.dump(config_data, f, indent=4)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Could not save configuration file:\n{e}")
-            raise e
+        # Serialize first and write once: json.dump issues a write call
+        # per token, and a failed dump would leave the file truncated
+        text = json.dumps(config_data, indent=4)
+        with open(file_path, 'w') as f:
+            f.write(text)
 
     def load_config_from_dropdown(self):
         """Load configuration when selected from dropdown."""
@@ -9086,12 +9551,13 @@ layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
             self.update_macropad_display()
             self.sync_extension_checkboxes()
             self.update_extension_button_states()
-            try:
-                self.save_extension_configs()
-            except Exception:
-                pass
+            # Write the extension files once control is back in the event loop,
+            # keeping disk I/O out of the load itself
+            QTimer.singleShot(0, self._save_extension_configs_quietly)
 
             if show_message:
+                rgb_cfg = self.rgb_matrix_config
+                key_colors = rgb_cfg.get('key_colors') or ()
                 QMessageBox.information(
                     self,
                     "Success",
@@ -9100,8 +9566,8 @@ layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
                     f"Format: v{version}\n"
                     f"Layers: {len(self.keymap_data)}\n"
                     f"Macros: {len(self.macros)}\n"
-                    f"Configured key LEDs: {len(self.rgb_matrix_config.get('key_colors', {}))}\n"
-                    f"Underglow LEDs: {self.rgb_matrix_config.get('num_underglow', 0)}",
+                    f"Configured key LEDs: {len(key_colors)}\n"
+                    f"Underglow LEDs: {rgb_cfg.get('num_underglow', 0)}",
                 )
 
             return True
@@ -9114,7 +9580,9 @@ layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
     
     def _create_new_layer(self):
         """Helper to create a blank layer with default keys."""
-        return [[DEFAULT_KEY for _ in range(self.cols)] for _ in range(self.rows)]
+        # DEFAULT_KEY is an immutable string, so rows can be filled by list
+        # repetition; each row is still its own list so keys edit independently
+        return [[DEFAULT_KEY] * self.cols for _ in range(self.rows)]
 
     def initialize_keymap_data(self):
         """Initializes the keymap with a single default layer."""
@@ -9127,7 +9595,8 @@ layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
             widget = item.widget()
             if widget is not None:
                 widget.deleteLater()
-        self.macropad_buttons.clear()
+        self.macropad_buttons = []
+        self._macropad_cell_cache.clear()
         # Do not forcibly clear the selected_key_coords here so that
         # recreate_macropad_grid can restore the selected button if it
         # still exists in the new grid.
@@ -9145,43 +9614,59 @@ layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
         
         Note:
             Restores previous selection state if the key still exists after rebuild.
+            When the grid already has a button for every key, the existing buttons
+            are kept and only their selection state is reset. Button labels are
+            not filled in here; callers follow up with update_macropad_display().
         """
-        self.clear_macropad_grid()
-        # Iterate in reverse (180° rotation) to match physical board orientation
-        for r in range(self.rows - 1, -1, -1):
-            for c in range(self.cols - 1, -1, -1):
-                button = QPushButton()
-                button.setObjectName("keymapButton")
-                button.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-                button.setMinimumSize(100, 100)  # Increased from 80 to 100 for modern layout
-                button.setCheckable(True)
-                button.clicked.connect(partial(self.on_key_selected, r, c))
-                # allow double-click detection via the main window's eventFilter
-                button.installEventFilter(self)
-                
-                # Enable context menu (right-click)
-                button.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-                button.customContextMenuRequested.connect(partial(self.show_key_context_menu, r, c))
-                
-                # Add coordinate label for easier identification
-                button.setProperty("coords", f"({r},{c})")
-                
-                try:
-                    self._install_hover_effect(button)
-                except Exception:
-                    pass
-                # Display at inverted position while keeping actual keymap coordinates
-                display_r = self.rows - 1 - r
-                display_c = self.cols - 1 - c
-                self.macropad_layout.addWidget(button, display_r, display_c)
-                self.macropad_buttons[(r, c)] = button
+        if self._macropad_grid_matches():
+            # Same dimensions - buttons, positions and connections are all still
+            # valid, so skip destroying and recreating rows*cols widgets
+            for _, _, button in self.iter_macropad_buttons():
+                button.setChecked(False)
+        else:
+            # Hold off repaints and relayouts until the whole grid is rebuilt, so Qt
+            # lays out and paints once instead of once per inserted button
+            self.macropad_group.setUpdatesEnabled(False)
+            self.macropad_group.blockSignals(True)
+            try:
+                self.clear_macropad_grid()
+                self.macropad_buttons = [[None] * self.cols for _ in range(self.rows)]
+                # Iterate in reverse (180° rotation) to match physical board orientation
+                for r, c, display_r, display_c in macropad_grid_order(self.rows, self.cols):
+                    button = KeyButton()
+                    button.setObjectName("keymapButton")
+                    button.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+                    button.setMinimumSize(100, 100)  # Increased from 80 to 100 for modern layout
+                    button.setCheckable(True)
+                    # Keymap coordinates live on the button, so every button shares the
+                    # same bound slots instead of carrying its own partial() objects
+                    button.setProperty("row", r)
+                    button.setProperty("col", c)
+                    button.clicked.connect(self._on_grid_button_clicked)
+                    button.doubleClicked.connect(self._on_grid_button_double_clicked)
+                    
+                    # Enable context menu (right-click)
+                    button.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+                    button.customContextMenuRequested.connect(self._on_grid_button_context_menu)
+                    
+                    # Add coordinate label for easier identification
+                    button.setProperty("coords", f"({r},{c})")
+                    
+                    # Hover feedback comes from the theme's QPushButton:hover rule
+                    # Display at inverted position while keeping actual keymap coordinates
+                    self.macropad_layout.addWidget(button, display_r, display_c)
+                    self.macropad_buttons[r][c] = button
+            finally:
+                self.macropad_group.blockSignals(False)
+                self.macropad_group.setUpdatesEnabled(True)
+
         # If we have a previously-selected key and it still exists in the
         # newly-created grid, restore its checked state and label so the
         # user sees it highlighted.
         if self.selected_key_coords:
             r_sel, c_sel = self.selected_key_coords
-            if (r_sel, c_sel) in self.macropad_buttons and 0 <= r_sel < self.rows and 0 <= c_sel < self.cols:
-                btn = self.macropad_buttons[(r_sel, c_sel)]
+            btn = self.get_macropad_button(r_sel, c_sel)
+            if btn is not None:
                 btn.setChecked(True)
                 if hasattr(self, 'selected_key_label'):
                     self.selected_key_label.setText(f"Selected Key: ({r_sel}, {c_sel})")
@@ -9191,7 +9676,42 @@ layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
                 if hasattr(self, 'selected_key_label'):
                     self.selected_key_label.setText("Selected Key: None")
 
-        self.update_macropad_display()
+    def _on_grid_button_clicked(self):
+        """Route a grid button click to on_key_selected using the button's coordinates."""
+        button = self.sender()
+        self.on_key_selected(button.property("row"), button.property("col"))
+
+    def _on_grid_button_double_clicked(self):
+        """Route a grid button double-click to on_key_double_clicked."""
+        button = self.sender()
+        self.on_key_double_clicked(button.property("row"), button.property("col"))
+
+    def _on_grid_button_context_menu(self, pos):
+        """Route a grid button context-menu request to show_key_context_menu."""
+        button = self.sender()
+        self.show_key_context_menu(button.property("row"), button.property("col"), pos)
+
+    def _macropad_grid_matches(self):
+        """Return True if there is exactly one grid button for every (row, col)."""
+        return len(self.macropad_buttons) == self.rows and all(
+            len(row_buttons) == self.cols and None not in row_buttons
+            for row_buttons in self.macropad_buttons
+        )
+
+    def get_macropad_button(self, row, col):
+        """Return the grid button for keymap coordinates (row, col), or None if there is none."""
+        if 0 <= row < len(self.macropad_buttons):
+            row_buttons = self.macropad_buttons[row]
+            if 0 <= col < len(row_buttons):
+                return row_buttons[col]
+        return None
+
+    def iter_macropad_buttons(self):
+        """Yield (row, col, button) for every button in the grid."""
+        for r, row_buttons in enumerate(self.macropad_buttons):
+            for c, button in enumerate(row_buttons):
+                if button is not None:
+                    yield r, c, button
 
     def update_grid_dimensions(self, force_update=False):
         """Grid dimensions are fixed - this method is kept for compatibility."""
@@ -9221,27 +9741,43 @@ layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
     
     def on_layer_changed(self, index):
         """Handles switching between layer tabs."""
-        if index != -1:
-            self.current_layer = index
-            self.selected_key_coords = None 
-            self.selected_key_label.setText("Selected Key: None")
-            for button in self.macropad_buttons.values():
+        if index == -1:
+            return
+        # Nothing to do if this layer is already shown with no key selected
+        # (e.g. load_configuration sets current_layer before selecting the tab)
+        if index == self.current_layer and not self.selected_key_coords:
+            return
+        self.current_layer = index
+        if self.selected_key_coords:
+            # Only the selected key's button is ever checked
+            button = self.get_macropad_button(*self.selected_key_coords)
+            if button:
                 button.setChecked(False)
-            self.update_macropad_display()
-            # Save session state when layer changes
-            self.save_session_state()
+        self.selected_key_coords = None 
+        self.selected_key_label.setText("Selected Key: None")
+        self.update_macropad_display()
+        # Save session state when layer changes
+        self.save_session_state()
 
     def update_layer_tabs(self):
-        """Clears and rebuilds the layer tabs from the keymap data."""
+        """Brings the layer tabs in line with the keymap data.
+
+        Only the difference is applied: missing tabs are appended and surplus
+        tabs removed from the end, so adding or removing one layer touches one tab.
+        """
         self.layer_tabs.blockSignals(True)
         current_index = self.layer_tabs.currentIndex()
-        self.layer_tabs.clear()
-        for i in range(len(self.keymap_data)):
-            tab = QWidget()
-            placeholder_layout = QVBoxLayout(tab)
-            placeholder_layout.setContentsMargins(0, 0, 0, 0)
-            placeholder_layout.addStretch()
-            self.layer_tabs.addTab(tab, f"Layer {i}")
+        target_count = len(self.keymap_data)
+        while self.layer_tabs.count() > target_count:
+            last = self.layer_tabs.count() - 1
+            page = self.layer_tabs.widget(last)
+            self.layer_tabs.removeTab(last)
+            if page is not None:
+                page.deleteLater()  # removeTab() does not delete the page widget
+        for i in range(self.layer_tabs.count(), target_count):
+            # The grid is drawn outside the tab widget, so a page only has to
+            # exist - a bare QWidget needs no layout of its own
+            self.layer_tabs.addTab(QWidget(), f"Layer {i}")
             self.layer_tabs.setTabToolTip(i, f"Layer {i}")
 
         if self.layer_tabs.count():
@@ -9254,12 +9790,6 @@ layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
         """Handles the logic for selecting and deselecting a key on the grid."""
         clicked_coords = (row, col)
         
-        # Uncheck the previously selected button if it's different
-        if self.selected_key_coords and self.selected_key_coords != clicked_coords:
-            prev_button = self.macropad_buttons.get(self.selected_key_coords)
-            if prev_button:
-                prev_button.setChecked(False)
-
         # If clicking the same key again, deselect it
         if self.selected_key_coords == clicked_coords:
             self.selected_key_coords = None
@@ -9268,16 +9798,25 @@ layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
             if hasattr(self, 'grid_selection_label'):
                 self.grid_selection_label.setText("Selected: None")
             # The button's check state is toggled automatically by PyQt
-        else: # Otherwise, select the new key
-            self.selected_key_coords = clicked_coords
-            key_value = self.keymap_data[self.current_layer][row][col] if self.current_layer < len(self.keymap_data) else "KC.NO"
-            self.selected_key_label.setText(f"Selected Key: ({row}, {col})")
-            # Update grid selection label if it exists
-            if hasattr(self, 'grid_selection_label'):
-                self.grid_selection_label.setText(f"Selected: (Row {row}, Col {col}) | {key_value}")
-            current_button = self.macropad_buttons.get(clicked_coords)
-            if current_button:
-                current_button.setChecked(True)
+            self.save_session_state()
+            return
+
+        # Uncheck the previously selected button
+        if self.selected_key_coords:
+            prev_button = self.get_macropad_button(*self.selected_key_coords)
+            if prev_button:
+                prev_button.setChecked(False)
+
+        # Select the new key
+        self.selected_key_coords = clicked_coords
+        key_value = self.keymap_data[self.current_layer][row][col] if self.current_layer < len(self.keymap_data) else "KC.NO"
+        self.selected_key_label.setText(f"Selected Key: ({row}, {col})")
+        # Update grid selection label if it exists
+        if hasattr(self, 'grid_selection_label'):
+            self.grid_selection_label.setText(f"Selected: (Row {row}, Col {col}) | {key_value}")
+        current_button = self.get_macropad_button(row, col)
+        if current_button:
+            current_button.setChecked(True)
         
         # Save session state when key selection changes
         self.save_session_state()
@@ -9285,65 +9824,84 @@ layer_cycler = LayerCycler(keyboard, num_layers=len(keyboard.keymap))
     def update_macropad_display(self):
         """Updates the text on all grid buttons to reflect the current layer's keymap with enhanced formatting."""
         if self.current_layer >= len(self.keymap_data): return
+
+        self.update_macropad_cells((r, c) for r, c, _, _ in macropad_grid_order(self.rows, self.cols))
+        self.macropad_group.setTitle(f"⌨ Keymap Grid (Layer {self.current_layer})")
+
+    def get_layer_button_texts(self, layer_index):
+        """Return the grid button texts for every key of a layer.
+
+        The texts are built once per layer and reused until that layer's keys
+        change; the stored snapshot of the keys is compared on every call, so
+        edits made anywhere to keymap_data are picked up without invalidation.
+
+        Args:
+            layer_index: Index into keymap_data
+
+        Returns:
+            texts[row][col] - formatted key label with its (row,col) coordinate below
+        """
+        layer_data = self.keymap_data[layer_index]
+        snapshot = tuple(map(tuple, layer_data))
+        cached = self._layer_button_texts.get(layer_index)
+        if cached is not None and cached[0] == snapshot:
+            return cached[1]
+        # Format different key types for better readability, with the
+        # coordinate label below for easier identification
+        texts = [
+            [f"{format_keymap_button_label(key)}\n({r},{c})" for c, key in enumerate(row)]
+            for r, row in enumerate(layer_data)
+        ]
+        self._layer_button_texts[layer_index] = (snapshot, texts)
+        return texts
+
+    def update_macropad_cells(self, cells):
+        """Refresh the given grid buttons from the current layer's keymap.
+
+        Text and stylesheet are only pushed to a button when they differ from
+        what was last applied to it, so unchanged keys are not re-polished by Qt.
+
+        Args:
+            cells: Iterable of (row, col) keymap coordinates to refresh
+        """
+        if self.current_layer >= len(self.keymap_data): return
         
-        layer_data = self.keymap_data[self.current_layer]
+        button_texts = self.get_layer_button_texts(self.current_layer)
         rgb_cfg = getattr(self, 'rgb_matrix_config', build_default_rgb_matrix_config())
         layer_colors = (rgb_cfg.get('layer_key_colors', {}) or {}).get(str(self.current_layer), {})
-        key_colors = rgb_cfg.get('key_colors', {})
-        
-        idx = 0
-        for r in range(self.rows):
-            for c in range(self.cols):
-                button = self.macropad_buttons.get((r, c))
-                if button:
-                    key_text = layer_data[r][c]
-                    
-                    # Format different key types for better readability
-                    macro_match = re.match(r"MACRO\((\w+)\)", key_text)
-                    if macro_match:
-                        display_text = f"⚡ {macro_match.group(1)}"
-                    elif key_text.startswith("TD_"):
-                        # TapDance keys
-                        display_text = f"🎯 {key_text[3:]}"
-                    elif "MO(" in key_text or "TO(" in key_text or "TG(" in key_text or "DF(" in key_text:
-                        # Layer switching keys
-                        display_text = f"📚 {key_text.replace('KC.', '')}"
-                    elif key_text == "KC.NO":
-                        display_text = "✖"
-                    elif key_text == "KC.TRNS":
-                        display_text = "🔄 TRNS"
-                    else:
-                        # Standard keycodes - remove KC. prefix
-                        display_text = key_text.replace("KC.", "")
-                    
-                    # Add coordinate label below for easier identification
-                    full_text = f"{display_text}\n({r},{c})"
-                    button.setText(full_text)
-                    
-                    # Apply RGB color if assigned to this key
-                    color = layer_colors.get(str(idx)) or key_colors.get(str(idx))
-                    if color:
-                        # Use white text for dark colors, black text for light colors
-                        # Simple luminance check
-                        try:
-                            # Remove # and convert to RGB
-                            rgb = color.lstrip('#')
-                            r_val = int(rgb[0:2], 16)
-                            g_val = int(rgb[2:4], 16)
-                            b_val = int(rgb[4:6], 16)
-                            # Calculate perceived luminance
-                            luminance = (0.299 * r_val + 0.587 * g_val + 0.114 * b_val)
-                            text_color = '#000000' if luminance > 128 else '#FFFFFF'
-                        except:
-                            text_color = '#FFFFFF'
-                        
-                        button.setStyleSheet(f'background-color: {color}; color: {text_color}; font-weight: bold; font-size: 9pt;')
-                    else:
-                        # Clear any previous color styling but keep the default button style
-                        button.setStyleSheet('font-size: 9pt;')
-                idx += 1
-        self.macropad_group.setTitle(f"⌨ Keymap Grid (Layer {self.current_layer})")
-
+        # One int-keyed lookup per key instead of str(idx) and two dict probes;
+        # the layer's own colors win over the base key colors
+        colors_by_index = led_colors_by_index(rgb_cfg.get('key_colors', {}), layer_colors)
+        cell_cache = self._macropad_cell_cache
+        cols = self.cols
+        # Bound once: the loop below runs for every key of the grid
+        get_button = self.get_macropad_button
+        get_color = colors_by_index.get
+        get_applied = cell_cache.get
+        
+        for r, c in cells:
+            button = get_button(r, c)
+            if not button:
+                continue
+            full_text = button_texts[r][c]
+            
+            # Apply RGB color if assigned to this key (LED index is row-major)
+            color = get_color(r * cols + c)
+            if color is not None:
+                # Parsed once per distinct color rather than per key per refresh
+                style = colored_key_button_style(color)
+            else:
+                # Unlit keys need no stylesheet of their own: the theme's
+                # QPushButton#keymapButton rule supplies their font size
+                style = ''
+
+            # New buttons start out with no text and an empty stylesheet
+            applied_text, applied_style = get_applied((r, c), (None, ''))
+            if full_text != applied_text:
+                button.setText(full_text)
+            if style != applied_style:
+                button.setStyleSheet(style)
+            cell_cache[(r, c)] = (full_text, style)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)